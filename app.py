@@ -4,7 +4,7 @@ import os
 import cassandra1.cmodel
 from cassandra.cluster import Cluster
 from dgraph.model import analyze_player_performance, create_data, get_player_stats_by_league, get_player_stats_by_country, get_player_stats_by_age, get_basic_player_stats, search_players, compare_players, get_top_scorers, create_client, set_schema
-from mongo.mainmongo import match_history, player_injuries, getTeams,upcoming_matches,match_result,recent_matches,past_matches,player_transfers,awards,player_value
+from mongo.mainmongo import match_history, player_injuries, getTeams,upcoming_matches,match_result,recent_matches,past_matches,player_transfers,awards,player_value,squad_report
 
 
 
@@ -38,7 +38,8 @@ functions = {"1": "Show Teams",
             "27":"Search for players by name",
             "28":"Compare players",
             "29":"Get top scorers",
-            "30":"Exit"}
+            "30":"Exit",
+            "31":"Squad report"}
 
 
 
@@ -175,6 +176,9 @@ def main():
         elif choice == '30':
             print("Exiting...")
             exit()
+        elif choice == '31':
+            players = input("Enter the player names, separated by commas: ")
+            squad_report([player.strip() for player in players.split(",") if player.strip()])
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -3,80 +3,49 @@
 import os
 
 from fastapi import FastAPI
-from pymongo import MongoClient,   ASCENDING, TEXT
+from pymongo import MongoClient
 
-from mongo.routes import router as mongo_router
+from mongo.autocomplete import name_index
+from mongo.indexes import IndexReconciler
+from mongo.injuries import injury_intervals
 
 app = FastAPI()
 MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017")
 MONGO_DB_NAME = os.getenv("MONGO_DB_NAME", "football_db")
+# MONGO_ASYNC=1 serves the Motor-backed router instead of the blocking one
+MONGO_ASYNC = os.getenv("MONGO_ASYNC", "0").lower() in ("1", "true", "yes")
+# _id UUIDs are stored as BSON Binary subtype 4 and read back as uuid.UUID
+UUID_REPRESENTATION = "standard"
 
-def create_indexes():
-    # Teams collection
-    try:
-        app.database.teams.drop_indexes()
-        app.database.matches.drop_indexes()
-        app.database.player_injuries.drop_indexes()
-        app.database.player_transfers.drop_indexes()
-        app.database.awards.drop_indexes()
-        app.database.player_values.drop_indexes()
-    except Exception as e:
-        print(f"Error dropping indexes: {e}")
-    finally:
-        print("Finished attempting to drop indexes")
-    app.database.teams.create_index([("team_name", TEXT)])
-
-    # Matches collection
-    app.database.matches.create_index([("date", ASCENDING)])
-    # Combine all text fields into a single text index
-    app.database.matches.create_index([
-        ("home_team_name", TEXT),
-        ("away_team_name", TEXT),
-        ("status", TEXT)
-    ], name="matches_text_search")
-
-    # Player injuries collection
-    # Combine all text fields into a single text index
-    app.database.player_injuries.create_index([
-        ("player_name", TEXT),
-        ("team_name", TEXT),
-        ("status", TEXT)
-    ], name="injuries_text_search")
-
-    # Transfers collection
-    # Combine all text fields into a single text index
-    app.database.player_transfers.create_index([
-        ("player_name", TEXT),
-        ("from_team_name", TEXT),
-        ("team_name", TEXT)
-    ], name="transfers_text_search")
-    app.database.player_transfers.create_index([("transfer_date", -1)])
-
-    # Awards collection
-    # Combine text fields into a single text index
-    app.database.awards.create_index([
-        ("recipient_name", TEXT),
-        ("award_name", TEXT)
-    ], name="awards_text_search")
-    app.database.awards.create_index([("season", ASCENDING)])
-
-    # Player values collection
-    app.database.player_values.create_index([("player_name", TEXT)])
-
-
+if MONGO_ASYNC:
+    from motor.motor_asyncio import AsyncIOMotorClient
+    from mongo.async_routes import router as mongo_router
+else:
+    from mongo.routes import router as mongo_router
 
 @app.on_event("startup")
 def startup_db_client():
-    app.mongodb_client = MongoClient(MONGO_URI)
+    app.mongodb_client = MongoClient(MONGO_URI, uuidRepresentation=UUID_REPRESENTATION)
     app.database = app.mongodb_client[MONGO_DB_NAME]
     print(f"Connected to MongoDB at: {MONGO_URI} \n\t Database: {MONGO_DB_NAME}")
-    create_indexes()
-    print("Indexes created")
+    if MONGO_ASYNC:
+        app.async_mongodb_client = AsyncIOMotorClient(MONGO_URI, uuidRepresentation=UUID_REPRESENTATION)
+        app.async_database = app.async_mongodb_client[MONGO_DB_NAME]
+        print("Serving Mongo routes with the async (Motor) driver")
+    # Builds missing indexes and drops stale ones in the background; see GET /admin/indexes
+    app.index_reconciler = IndexReconciler(app.database)
+    app.index_reconciler.start()
+    name_index.load(app.database)
+    print(f"Autocomplete index loaded with {len(name_index)} names")
+    injury_intervals.load(app.database)
+    print(f"Injury interval tree loaded with {len(injury_intervals)} injuries")
 
     
 @app.on_event("shutdown")
 def shutdown_db_client():
     app.mongodb_client.close()
+    if MONGO_ASYNC:
+        app.async_mongodb_client.close()
     print("Connection to MongoDB closed")
 
 app.include_router(mongo_router)
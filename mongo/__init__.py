@@ -1 +1 @@
-from .model import Team, PlayerInjuries, Awards, Matches,PlayerTransfers,PlayerValues
\ No newline at end of file
+from .model import Team, PlayerInjuries, Awards, Matches,MatchStats,PlayerTransfers,PlayerValues,BulkItemResult,BulkInsertResult,SearchHit,NameSuggestion,FormMatch,TeamForm,StandingRow,HeadToHead
\ No newline at end of file
@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+# Async variant of mongo/routes.py backed by Motor (request.app.async_database).
+# Same paths and response models, enabled with MONGO_ASYNC=1 (see main.py).
+from fastapi import APIRouter, Body, Request, Response, HTTPException, status,Query
+from fastapi.concurrency import run_in_threadpool
+from typing import Dict, List, Optional
+
+from .model import Team, PlayerInjuries, Awards, Matches,PlayerTransfers,PlayerValues,BulkInsertResult,SearchHit,NameSuggestion,TeamForm,StandingRow,HeadToHead,QueryDate,to_document
+from .bulk import async_insert_batch, inserted_items
+from .streaming import async_list_or_stream
+from .cache import COLLECTIONS, cached, response_cache
+from .autocomplete import fold, name_index
+from .injuries import injury_intervals, default_day, naive_utc, today
+from .etag import conditional
+from .projection import select_fields, respond
+from .match_stats import with_match_stats
+from .standings import async_team_form, async_standings, async_head_to_head
+from .values import with_value_stats, async_append_value
+from .search import MAX_SEARCH_RESULTS, SKIPPED_HEADER, searchable_model, async_search, async_search_all
+from .queries import INJURIES_ORDER, active_injuries_query, team_query, status_matches_query, scored_matches_query, stats_matches_query, team_matches_query, player_query, players_query, with_date_range, overlapping, group_by_player, awards_query, explain_cursor, summarize_explain
+from .pagination import MAX_PAGE_SIZE, TEAMS_ORDER, MATCHES_ORDER, MATCHES_SORTS, AWARDS_ORDER, TRANSFERS_ORDER, keyset_find, async_paginate
+
+router = APIRouter()
+
+# Most player names accepted by the /.../batch routes
+MAX_BATCH_PLAYERS = 100
+
+@router.post("/team", response_description="Add new team", status_code=status.HTTP_201_CREATED,response_model=Team)
+async def create_team(request:Request, team:Team=Body(...)):
+    team = to_document(team)
+    # insert_one fills in _id on the document, so it is returned as is instead of read back
+    await request.app.async_database["teams"].insert_one(team)
+    response_cache.invalidate("teams")
+    name_index.add_document("teams", team)
+    return team
+
+@router.get("/team",response_description="get Team",status_code = status.HTTP_200_OK,response_model=Team)
+@conditional("teams")
+async def get_team(team:str,request: Request, response: Response, fields: Optional[str] = None):
+    model, projection = select_fields(Team, fields)
+    if(found := await request.app.async_database["teams"].find_one(team_query(team), projection))is not None:
+        return respond(found, model)
+    raise HTTPException(status_code=404,detail=f"Team {team} not found")
+
+@router.get("/teams", response_description="get Teams", status_code=status.HTTP_200_OK, response_model=List[Team])
+@conditional("teams")
+@cached("teams", ttl=300)
+async def get_teams(request: Request, response: Response, batch_size: Optional[int] = Query(None, gt=0),
+        limit: Optional[int] = Query(None, gt=0, le=MAX_PAGE_SIZE), after: Optional[str] = None, fields: Optional[str] = None):
+    model, projection = select_fields(Team, fields, TEAMS_ORDER)
+    docs = keyset_find(request.app.async_database["teams"], {}, TEAMS_ORDER, limit, after, projection)
+    if limit:
+        docs = await async_paginate(docs, TEAMS_ORDER, limit, response)
+    return await async_list_or_stream(request, docs, model, batch_size, response.headers)
+
+@router.post("/player_injuries", response_description="Add new player injury", status_code=status.HTTP_201_CREATED,response_model=PlayerInjuries)
+async def create_player_injury(request:Request, player_injury:PlayerInjuries=Body(...)):
+    player_injury = to_document(player_injury)
+    await request.app.async_database["player_injuries"].insert_one(player_injury)
+    response_cache.invalidate("player_injuries")
+    injury_intervals.invalidate()
+    name_index.add_document("player_injuries", player_injury)
+    return player_injury
+
+@router.get("/player_injuries", response_description="get Player Injuries", status_code=status.HTTP_200_OK, response_model=PlayerInjuries)
+@conditional("player_injuries")
+async def get_player_injuries(request: Request, response: Response, player_name: Optional[str] = Query(None), fields: Optional[str] = None,
+        from_date: Optional[QueryDate] = Query(None, alias="from"), to_date: Optional[QueryDate] = Query(None, alias="to")):
+    model, projection = select_fields(PlayerInjuries, fields)
+    player_injury = await request.app.async_database["player_injuries"].find_one(overlapping(player_query(player_name), "start_date", "end_date", from_date, to_date), projection)
+    if player_injury:
+        return respond(player_injury, model)
+    raise HTTPException(status_code=404, detail=f"Player {player_name} not found")
+
+@router.post("/awards", response_description="Add new award", status_code=status.HTTP_201_CREATED,response_model=Awards)
+async def create_award(request:Request, award:Awards=Body(...)):
+    award = to_document(award)
+    await request.app.async_database["awards"].insert_one(award)
+    response_cache.invalidate("awards")
+    name_index.add_document("awards", award)
+    return award
+
+@router.get("/awards", response_description="get Awards", status_code=status.HTTP_200_OK, response_model=List[Awards])
+@conditional("awards")
+async def get_awards(request: Request, response: Response, awarded:str,
+        limit: Optional[int] = Query(None, gt=0, le=MAX_PAGE_SIZE), after: Optional[str] = None, fields: Optional[str] = None):
+    model, projection = select_fields(Awards, fields, AWARDS_ORDER)
+    awards = keyset_find(request.app.async_database["awards"], awards_query(awarded), AWARDS_ORDER, limit, after, projection)
+    if limit:
+        return respond(await async_paginate(awards, AWARDS_ORDER, limit, response), model, response.headers)
+    return respond(await awards.to_list(length=None), model)
+
+@router.post("/matches", response_description="Add new match", status_code=status.HTTP_201_CREATED,response_model=Matches)
+async def create_match(request:Request, match:Matches=Body(...)):
+    match = with_match_stats(to_document(match))
+    await request.app.async_database["matches"].insert_one(match)
+    response_cache.invalidate("matches")
+    name_index.add_document("matches", match)
+    return match
+
+@router.get("/matches", response_description="get Matches", status_code=status.HTTP_200_OK, response_model=List[Matches])
+@conditional("matches")
+@cached("matches", ttl=30)
+async def get_matches(request: Request, response: Response, batch_size: Optional[int] = Query(None, gt=0),
+        limit: Optional[int] = Query(None, gt=0, le=MAX_PAGE_SIZE), after: Optional[str] = None, fields: Optional[str] = None,
+        from_date: Optional[QueryDate] = Query(None, alias="from"), to_date: Optional[QueryDate] = Query(None, alias="to"),
+        before: Optional[QueryDate] = None, match_status: str = Query("Finished", alias="status"),
+        sort: Optional[str] = Query(None, regex="^-?date$")):
+    # after is the pagination cursor; before is an exclusive upper date bound like to
+    order = MATCHES_SORTS[sort or "date"]
+    end = min((naive_utc(bound) for bound in (to_date, before) if bound is not None), default=None)
+    model, projection = select_fields(Matches, fields, order)
+    docs = keyset_find(request.app.async_database["matches"], with_date_range(status_matches_query(match_status), "date", from_date, end), order, limit, after, projection, ordered=sort is not None)
+    if limit:
+        docs = await async_paginate(docs, order, limit, response)
+    return await async_list_or_stream(request, docs, model, batch_size, response.headers)
+
+@router.get("/upcoming_matches", response_description="get Upcoming Matches", status_code=status.HTTP_200_OK, response_model=List[Matches])
+@conditional("matches")
+@cached("matches", ttl=30)
+async def get_upcoming_matches(request: Request, response: Response, batch_size: Optional[int] = Query(None, gt=0),
+        limit: Optional[int] = Query(None, gt=0, le=MAX_PAGE_SIZE), after: Optional[str] = None, fields: Optional[str] = None,
+        from_date: Optional[QueryDate] = Query(None, alias="from"), to_date: Optional[QueryDate] = Query(None, alias="to")):
+    model, projection = select_fields(Matches, fields, MATCHES_ORDER)
+    docs = keyset_find(request.app.async_database["matches"], with_date_range(status_matches_query("Scheduled"), "date", from_date, to_date), MATCHES_ORDER, limit, after, projection)
+    if limit:
+        docs = await async_paginate(docs, MATCHES_ORDER, limit, response)
+    return await async_list_or_stream(request, docs, model, batch_size, response.headers)
+
+@router.get("/matches_score", response_description="get Matches with score", status_code=status.HTTP_200_OK, response_model=List[Matches])
+@conditional("matches")
+async def get_matches_score(request: Request, response: Response, batch_size: Optional[int] = Query(None, gt=0),
+        limit: Optional[int] = Query(None, gt=0, le=MAX_PAGE_SIZE), after: Optional[str] = None, fields: Optional[str] = None,
+        from_date: Optional[QueryDate] = Query(None, alias="from"), to_date: Optional[QueryDate] = Query(None, alias="to")):
+    model, projection = select_fields(Matches, fields, MATCHES_ORDER)
+    docs = keyset_find(request.app.async_database["matches"], with_date_range(scored_matches_query(), "date", from_date, to_date), MATCHES_ORDER, limit, after, projection)
+    if limit:
+        docs = await async_paginate(docs, MATCHES_ORDER, limit, response)
+    return await async_list_or_stream(request, docs, model, batch_size, response.headers)
+
+@router.get("/matches/head_to_head", response_description="Matches and results between two teams", status_code=status.HTTP_200_OK, response_model=HeadToHead)
+@conditional("matches")
+@cached("matches", ttl=60)
+async def get_head_to_head(request: Request, response: Response, team_a: str, team_b: str):
+    if fold(team_a) == fold(team_b):
+        raise HTTPException(status_code=400, detail="team_a and team_b must be different teams")
+    return await async_head_to_head(request.app.async_database, team_a, team_b)
+
+@router.get("/matches_stats", response_description="get Matches by parsed score and statistics", status_code=status.HTTP_200_OK, response_model=List[Matches])
+@conditional("matches")
+async def get_matches_stats(request: Request, response: Response, min_goal_difference: Optional[int] = Query(None, ge=0),
+        clean_sheet: Optional[bool] = None, min_shots: Optional[int] = Query(None, ge=0), batch_size: Optional[int] = Query(None, gt=0),
+        limit: Optional[int] = Query(None, gt=0, le=MAX_PAGE_SIZE), after: Optional[str] = None, fields: Optional[str] = None,
+        from_date: Optional[QueryDate] = Query(None, alias="from"), to_date: Optional[QueryDate] = Query(None, alias="to")):
+    model, projection = select_fields(Matches, fields, MATCHES_ORDER)
+    query = stats_matches_query(min_goal_difference, clean_sheet, min_shots)
+    docs = keyset_find(request.app.async_database["matches"], with_date_range(query, "date", from_date, to_date), MATCHES_ORDER, limit, after, projection)
+    if limit:
+        docs = await async_paginate(docs, MATCHES_ORDER, limit, response)
+    return await async_list_or_stream(request, docs, model, batch_size, response.headers)
+
+@router.get("/matches_team", response_description="get Matches by team", status_code=status.HTTP_200_OK, response_model=List[Matches]) #param is team_name
+@conditional("matches")
+async def get_matches_team(request: Request, response: Response, team_name:str, fields: Optional[str] = None,
+        from_date: Optional[QueryDate] = Query(None, alias="from"), to_date: Optional[QueryDate] = Query(None, alias="to")):
+    # solo primeros 5 partidos
+    model, projection = select_fields(Matches, fields)
+    return respond(await request.app.async_database["matches"].find(with_date_range(team_matches_query(team_name), "date", from_date, to_date), projection).limit(5).to_list(length=5), model)
+
+@router.get("/matches_team_all", response_description="get Matches by team", status_code=status.HTTP_200_OK, response_model=List[Matches]) #param is team_name
+@conditional("matches")
+async def get_matches_team_all(request: Request, response: Response, team_name:str, batch_size: Optional[int] = Query(None, gt=0),
+        limit: Optional[int] = Query(None, gt=0, le=MAX_PAGE_SIZE), after: Optional[str] = None, fields: Optional[str] = None,
+        from_date: Optional[QueryDate] = Query(None, alias="from"), to_date: Optional[QueryDate] = Query(None, alias="to")):
+    model, projection = select_fields(Matches, fields, MATCHES_ORDER)
+    docs = keyset_find(request.app.async_database["matches"], with_date_range(team_matches_query(team_name), "date", from_date, to_date), MATCHES_ORDER, limit, after, projection)
+    if limit:
+        docs = await async_paginate(docs, MATCHES_ORDER, limit, response)
+    return await async_list_or_stream(request, docs, model, batch_size, response.headers)
+
+@router.get("/teams/{name:path}/form", response_description="Results of a team's last matches", status_code=status.HTTP_200_OK, response_model=TeamForm)
+@conditional("matches")
+@cached("matches", ttl=60)
+async def get_team_form(request: Request, response: Response, name: str, last: int = Query(5, gt=0, le=100)):
+    if (form := await async_team_form(request.app.async_database, name, last)) is not None:
+        return form
+    raise HTTPException(status_code=404, detail=f"No played matches found for team {name}")
+
+@router.get("/standings", response_description="League table of the played matches", status_code=status.HTTP_200_OK, response_model=List[StandingRow])
+@conditional("matches")
+@cached("matches", ttl=60)
+async def get_standings(request: Request, response: Response,
+        from_date: Optional[QueryDate] = Query(None, alias="from"), to_date: Optional[QueryDate] = Query(None, alias="to")):
+    return await async_standings(request.app.async_database, from_date, to_date)
+
+@router.post("/player_transfers", response_description="Add new player transfer", status_code=status.HTTP_201_CREATED,response_model=PlayerTransfers)
+async def create_player_transfer(request:Request, player_transfer:PlayerTransfers=Body(...)):
+    player_transfer = to_document(player_transfer)
+    await request.app.async_database["player_transfers"].insert_one(player_transfer)
+    response_cache.invalidate("player_transfers")
+    name_index.add_document("player_transfers", player_transfer)
+    return player_transfer
+
+@router.get("/player_transfers", response_description="get Player Transfers", status_code=status.HTTP_200_OK, response_model=List[PlayerTransfers])
+@conditional("player_transfers")
+async def get_player_transfers(request: Request, response: Response, player_name:str,
+        limit: Optional[int] = Query(None, gt=0, le=MAX_PAGE_SIZE), after: Optional[str] = None, fields: Optional[str] = None,
+        from_date: Optional[QueryDate] = Query(None, alias="from"), to_date: Optional[QueryDate] = Query(None, alias="to")):
+    model, projection = select_fields(PlayerTransfers, fields, TRANSFERS_ORDER)
+    transfers = keyset_find(request.app.async_database["player_transfers"], with_date_range(player_query(player_name), "transfer_date", from_date, to_date), TRANSFERS_ORDER, limit, after, projection)
+    if limit:
+        return respond(await async_paginate(transfers, TRANSFERS_ORDER, limit, response), model, response.headers)
+    return respond(await transfers.to_list(length=None), model)
+
+@router.post("/player_values", response_description="Add new player value", status_code=status.HTTP_201_CREATED,response_model=PlayerValues)
+async def create_player_value(request:Request, player_value:PlayerValues=Body(...)):
+    player_value = with_value_stats(to_document(player_value))
+    await request.app.async_database["player_values"].insert_one(player_value)
+    response_cache.invalidate("player_values")
+    name_index.add_document("player_values", player_value)
+    return player_value
+
+@router.get("/player_values", response_description="get Player Values", status_code=status.HTTP_200_OK, response_model=List[PlayerValues])
+@conditional("player_values")
+@cached("player_values", ttl=60)
+async def get_player_values(request: Request, response: Response, player_name:str):
+    # statistics are maintained on write (see mongo/values.py), so this is a plain player_name lookup
+    results = await request.app.async_database["player_values"].find(player_query(player_name)).to_list(length=None)
+    if results:
+        return results
+    raise HTTPException(status_code=404, detail=f"Player {player_name} not found")
+
+@router.post("/player_values/{player_name}/values", response_description="Append a value to a player's history", status_code=status.HTTP_200_OK,response_model=PlayerValues)
+async def append_player_value(request:Request, player_name:str, value:int=Body(..., embed=True)):
+    player_value = await async_append_value(request.app.async_database["player_values"], player_name, value)
+    response_cache.invalidate("player_values")
+    name_index.add(player_name, "player")
+    return player_value
+
+@router.get("/player_injuries/active", response_description="get Player Injuries of a team active on a date or overlapping a period", status_code=status.HTTP_200_OK, response_model=List[PlayerInjuries])
+@conditional("player_injuries", vary=default_day)
+async def get_active_injuries(request: Request, response: Response, team_name: str, on: Optional[QueryDate] = None,
+        from_date: Optional[QueryDate] = Query(None, alias="from"), to_date: Optional[QueryDate] = Query(None, alias="to")):
+    # from/to select the injuries overlapping the period, otherwise those active on the date (default today)
+    if from_date is not None or to_date is not None:
+        query = overlapping(team_query(team_name), "start_date", "end_date", from_date, to_date)
+    else:
+        query = active_injuries_query(team_name, on or today())
+    return await request.app.async_database["player_injuries"].find(query).sort(INJURIES_ORDER).to_list(length=None)
+
+@router.get("/player_injuries/availability", response_description="Injuries active on a date, by team", status_code=status.HTTP_200_OK, response_model=Dict[str, List[PlayerInjuries]])
+@conditional("player_injuries", vary=default_day)
+async def get_injury_availability(request: Request, response: Response, on: Optional[QueryDate] = None):
+    # answered by the in-memory interval tree (mongo/injuries.py), every team at once
+    # a reload after a write reads through the blocking client, off the event loop
+    return await run_in_threadpool(injury_intervals.active_by_team, request.app.database, on or today())
+
+@router.get("/player_injuries/batch", response_description="get Player Injuries of several players", status_code=status.HTTP_200_OK, response_model=Dict[str, List[PlayerInjuries]])
+@conditional("player_injuries")
+async def get_player_injuries_batch(request: Request, response: Response, player_name: List[str] = Query(..., max_items=MAX_BATCH_PLAYERS)):
+    injuries = await request.app.async_database["player_injuries"].find(players_query(player_name)).to_list(length=None)
+    return group_by_player(injuries, player_name)
+
+@router.get("/player_transfers/batch", response_description="get Player Transfers of several players", status_code=status.HTTP_200_OK, response_model=Dict[str, List[PlayerTransfers]])
+@conditional("player_transfers")
+async def get_player_transfers_batch(request: Request, response: Response, player_name: List[str] = Query(..., max_items=MAX_BATCH_PLAYERS)):
+    transfers = await request.app.async_database["player_transfers"].find(players_query(player_name)).sort(TRANSFERS_ORDER).to_list(length=None)
+    return group_by_player(transfers, player_name)
+
+@router.get("/player_values/batch", response_description="get Player Values of several players", status_code=status.HTTP_200_OK, response_model=Dict[str, List[PlayerValues]])
+@conditional("player_values")
+async def get_player_values_batch(request: Request, response: Response, player_name: List[str] = Query(..., max_items=MAX_BATCH_PLAYERS)):
+    values = await request.app.async_database["player_values"].find(players_query(player_name)).to_list(length=None)
+    return group_by_player(values, player_name)
+
+@router.get("/autocomplete", response_description="Player and team names starting with a prefix", status_code=status.HTTP_200_OK, response_model=List[NameSuggestion])
+async def autocomplete(q: str, limit: int = Query(10, gt=0, le=100), kind: Optional[str] = Query(None, regex="^(player|team)$")):
+    # answered from memory, Mongo is not queried
+    return name_index.complete(q, limit, kind)
+
+@router.get("/search", response_description="Text search across every collection", status_code=status.HTTP_200_OK, response_model=List[SearchHit])
+async def search_everything(request: Request, response: Response, q: str, limit: int = Query(20, gt=0, le=MAX_SEARCH_RESULTS)):
+    hits, skipped = await async_search_all(request.app.async_database, q, limit)
+    if skipped:
+        response.headers[SKIPPED_HEADER] = ",".join(skipped)
+    return hits
+
+@router.get("/search/{collection}", response_description="Text search in one collection", status_code=status.HTTP_200_OK, response_model=List[SearchHit])
+async def search_collection(request: Request, collection: str, q: str, limit: int = Query(20, gt=0, le=MAX_SEARCH_RESULTS),
+        offset: int = Query(0, ge=0), fields: Optional[str] = None):
+    model, projection = select_fields(searchable_model(collection), fields)
+    return await async_search(request.app.async_database, collection, q, model, projection, limit, offset)
+
+@router.post("/team/bulk", response_description="Add teams in one batch", status_code=status.HTTP_201_CREATED,response_model=BulkInsertResult)
+async def create_teams_bulk(request:Request, items:List[dict]=Body(...)):
+    result = await async_insert_batch(request.app.async_database["teams"], items, Team)
+    response_cache.invalidate("teams")
+    name_index.add_documents("teams", inserted_items(items, result))
+    return result
+
+@router.post("/player_injuries/bulk", response_description="Add player injuries in one batch", status_code=status.HTTP_201_CREATED,response_model=BulkInsertResult)
+async def create_player_injuries_bulk(request:Request, items:List[dict]=Body(...)):
+    result = await async_insert_batch(request.app.async_database["player_injuries"], items, PlayerInjuries)
+    response_cache.invalidate("player_injuries")
+    injury_intervals.invalidate()
+    name_index.add_documents("player_injuries", inserted_items(items, result))
+    return result
+
+@router.post("/awards/bulk", response_description="Add awards in one batch", status_code=status.HTTP_201_CREATED,response_model=BulkInsertResult)
+async def create_awards_bulk(request:Request, items:List[dict]=Body(...)):
+    result = await async_insert_batch(request.app.async_database["awards"], items, Awards)
+    response_cache.invalidate("awards")
+    name_index.add_documents("awards", inserted_items(items, result))
+    return result
+
+@router.post("/matches/bulk", response_description="Add matches in one batch", status_code=status.HTTP_201_CREATED,response_model=BulkInsertResult)
+async def create_matches_bulk(request:Request, items:List[dict]=Body(...)):
+    result = await async_insert_batch(request.app.async_database["matches"], items, Matches, with_match_stats)
+    response_cache.invalidate("matches")
+    name_index.add_documents("matches", inserted_items(items, result))
+    return result
+
+@router.post("/player_transfers/bulk", response_description="Add player transfers in one batch", status_code=status.HTTP_201_CREATED,response_model=BulkInsertResult)
+async def create_player_transfers_bulk(request:Request, items:List[dict]=Body(...)):
+    result = await async_insert_batch(request.app.async_database["player_transfers"], items, PlayerTransfers)
+    response_cache.invalidate("player_transfers")
+    name_index.add_documents("player_transfers", inserted_items(items, result))
+    return result
+
+@router.post("/player_values/bulk", response_description="Add player values in one batch", status_code=status.HTTP_201_CREATED,response_model=BulkInsertResult)
+async def create_player_values_bulk(request:Request, items:List[dict]=Body(...)):
+    result = await async_insert_batch(request.app.async_database["player_values"], items, PlayerValues, with_value_stats)
+    response_cache.invalidate("player_values")
+    name_index.add_documents("player_values", inserted_items(items, result))
+    return result
+
+@router.delete("/all", response_description="Delete all data", status_code=status.HTTP_200_OK)
+async def delete_all(request:Request):
+    for collection in ("teams", "player_injuries", "awards", "matches", "player_transfers", "player_values"):
+        await request.app.async_database[collection].delete_many({})
+    response_cache.invalidate(*COLLECTIONS)
+    name_index.clear()
+    injury_intervals.invalidate()
+    print("All data deleted")
+    return Response(status_code=status.HTTP_200_OK)
+
+@router.get("/admin/indexes", response_description="Index reconciliation progress", status_code=status.HTTP_200_OK)
+async def get_index_progress(request:Request):
+    return await run_in_threadpool(request.app.index_reconciler.progress)
+
+@router.get("/debug/explain/{route}", response_description="Winning plan of a route's query", status_code=status.HTTP_200_OK)
+async def explain_route(route:str, request:Request):
+    # route parameters (team_name, player_name, awarded, team) are passed as query parameters
+    cursor = explain_cursor(request.app.async_database, route, dict(request.query_params))
+    return summarize_explain(route, await cursor.explain())
+
+@router.post("/cache/invalidate", response_description="Drop what the API keeps in memory about collections written outside it", status_code=status.HTTP_200_OK)
+async def invalidate_cache(request: Request, collection: List[str] = Query(...)):
+    # for writers that go straight to Mongo (mongo/data/sync.py): cached responses and ETags,
+    # the autocomplete names and the injury interval tree are rebuilt from the database
+    unknown = sorted(set(collection) - set(COLLECTIONS))
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown collections {', '.join(unknown)}; known: {', '.join(COLLECTIONS)}")
+    response_cache.invalidate(*collection)
+    if "player_injuries" in collection:
+        injury_intervals.invalidate()
+    await run_in_threadpool(name_index.reload, request.app.database)
+    return {"invalidated": collection}
+
+@router.get("/cache/stats", response_description="Response cache counters", status_code=status.HTTP_200_OK)
+async def get_cache_stats():
+    return response_cache.stats()
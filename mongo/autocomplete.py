@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# In-memory autocomplete over every player and team name stored in Mongo.
+# Names are accent folded and lower cased ("José" and "jose" both find "José Lozano") and kept
+# in a sorted array, once per word, so a prefix of any word is a bisect away.
+# The index is loaded at startup (main.py) and the POST routes add the names they write.
+import bisect
+import threading
+import unicodedata
+
+# collection -> (field, kind) pairs holding names; awards take their kind from recipient_type
+NAME_FIELDS = {
+    "teams": [("team_name", "team")],
+    "matches": [("home_team_name", "team"), ("away_team_name", "team")],
+    "player_injuries": [("player_name", "player"), ("team_name", "team")],
+    "player_transfers": [("player_name", "player"), ("team_name", "team"), ("from_team_name", "team")],
+    "player_values": [("player_name", "player")],
+}
+AWARD_KINDS = {"Player": "player", "Team": "team"}
+
+
+def fold(text: str) -> str:
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(stripped.casefold().split())
+
+
+class NameIndex:
+    def __init__(self):
+        self._entries = []  # sorted (folded suffix, name, kind)
+        self._names = set()  # (name, kind) already indexed
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._names)
+
+    @staticmethod
+    def _suffixes(name: str, kind: str) -> list:
+        words = fold(name).split(" ")
+        return [(" ".join(words[start:]), name, kind) for start in range(len(words))]
+
+    def add(self, name, kind: str):
+        if not isinstance(name, str) or not name.strip():
+            return
+        name = " ".join(name.split())
+        with self._lock:
+            if (name, kind) in self._names:
+                return
+            self._names.add((name, kind))
+            for entry in self._suffixes(name, kind):
+                bisect.insort(self._entries, entry)
+
+    def add_many(self, names):
+        """Index (name, kind) pairs with one sort at the end instead of an insort per name."""
+        with self._lock:
+            for name, kind in names:
+                if not isinstance(name, str) or not name.strip():
+                    continue
+                name = " ".join(name.split())
+                if (name, kind) in self._names:
+                    continue
+                self._names.add((name, kind))
+                self._entries.extend(self._suffixes(name, kind))
+            self._entries.sort()
+
+    def add_document(self, collection: str, doc: dict):
+        for field, kind in NAME_FIELDS.get(collection, []):
+            self.add(doc.get(field), kind)
+        if collection == "awards" and doc.get("recipient_type") in AWARD_KINDS:
+            self.add(doc.get("recipient_name"), AWARD_KINDS[doc["recipient_type"]])
+
+    def add_documents(self, collection: str, docs):
+        for doc in docs:
+            self.add_document(collection, doc)
+
+    def clear(self):
+        with self._lock:
+            self._entries = []
+            self._names = set()
+
+    def load(self, database):
+        """Index the distinct names of every collection."""
+        names = []
+        for collection, fields in NAME_FIELDS.items():
+            for field, kind in fields:
+                names.extend((name, kind) for name in database[collection].distinct(field))
+        for recipient_type, kind in AWARD_KINDS.items():
+            names.extend((name, kind) for name in database["awards"].distinct("recipient_name", {"recipient_type": recipient_type}))
+        self.add_many(names)
+
+    def reload(self, database):
+        """Rebuild from database and swap the result in, so lookups never see a partial index."""
+        fresh = NameIndex()
+        fresh.load(database)
+        with self._lock:
+            self._entries, self._names = fresh._entries, fresh._names
+
+    def complete(self, prefix: str, limit: int = 10, kind=None) -> list:
+        prefix = fold(prefix)
+        suggestions, seen = [], set()
+        with self._lock:
+            entries = self._entries
+            position = bisect.bisect_left(entries, (prefix,))
+            while position < len(entries) and len(suggestions) < limit:
+                folded, name, entry_kind = entries[position]
+                if not folded.startswith(prefix):
+                    break
+                position += 1
+                if (kind is not None and entry_kind != kind) or (name, entry_kind) in seen:
+                    continue
+                seen.add((name, entry_kind))
+                suggestions.append({"name": name, "kind": entry_kind})
+        return suggestions
+
+
+name_index = NameIndex()
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# Latency of repeated menu queries (the endpoints behind app.py's Mongo options) through a new
+# connection per request (bare requests.get, before) against the pooled keep-alive ApiClient
+# of mongo/mainmongo.py (after). Needs the API running on MONGO_BASE_URL.
+# usage: python -m mongo.benchmarks.client_latency [rounds]
+import statistics
+import sys
+import time
+
+import requests
+
+from mongo.mainmongo import MONGO_BASE_URL, ApiClient
+
+# (path, params) of the menu queries
+MENU_QUERIES = [
+    ("/teams", {"fields": "team_name"}),
+    ("/matches", {"fields": "home_team_name,away_team_name,date,score"}),
+    ("/upcoming_matches", {"fields": "home_team_name,away_team_name,date"}),
+    ("/matches_score", {"fields": "home_team_name,away_team_name,score"}),
+    ("/standings", {}),
+]
+
+
+def measure(get, rounds):
+    latencies = []
+    for _ in range(rounds):
+        for path, params in MENU_QUERIES:
+            start = time.perf_counter()
+            get(MONGO_BASE_URL + path, params=params).content
+            latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    client = ApiClient()
+    try:
+        # warm up the server side caches so both runs read the same cached responses
+        measure(client.get, 5)
+        for label, get in (("before (requests.get)", requests.get), ("after (pooled ApiClient)", client.get)):
+            latencies = measure(get, rounds)
+            cuts = statistics.quantiles(latencies, n=100)
+            print(f"{label:26} p50={cuts[49]:.3f} ms  p99={cuts[98]:.3f} ms  mean={statistics.fmean(latencies):.3f} ms  n={len(latencies)}")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
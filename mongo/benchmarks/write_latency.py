@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# Write latency of the POST handlers: insert_one + find_one read-back (before)
+# against insert_one alone (after). Runs against a scratch collection.
+# usage: python mongo/benchmarks/write_latency.py [iterations]
+import os
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime
+
+from pymongo import MongoClient
+
+MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017")
+MONGO_DB_NAME = os.getenv("MONGO_DB_NAME", "football_db")
+COLLECTION = "bench_write_latency"
+
+
+def sample_match():
+    return {
+        "_id": str(uuid.uuid4()),
+        "home_team_name": "América",
+        "away_team_name": "Chivas de Guadalajara",
+        "date": datetime(2024, 11, 10),
+        "status": "Finished",
+        "score": "2-1",
+        "officials": ["Referee: John Doe", "Assistant 1: Jane Smith", "Assistant 2: Alex Johnson"],
+        "statistics": ["Possession: 55%", "Shots: 15", "Shots on Target: 6", "Corners: 7", "Fouls: 12"],
+    }
+
+
+def insert_and_read_back(collection, doc):
+    new_doc = collection.insert_one(doc)
+    return collection.find_one({"_id": new_doc.inserted_id})
+
+
+def insert_only(collection, doc):
+    collection.insert_one(doc)
+    return doc
+
+
+def measure(collection, write, iterations):
+    latencies = []
+    for _ in range(iterations):
+        doc = sample_match()
+        start = time.perf_counter()
+        write(collection, doc)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    client = MongoClient(MONGO_URI)
+    collection = client[MONGO_DB_NAME][COLLECTION]
+    collection.drop()
+    try:
+        # warm up the connection pool before timing
+        measure(collection, insert_only, 50)
+        for label, write in (("before (insert_one + find_one)", insert_and_read_back), ("after (insert_one)", insert_only)):
+            latencies = measure(collection, write, iterations)
+            cuts = statistics.quantiles(latencies, n=100)
+            print(f"{label:32} p50={cuts[49]:.3f} ms  p99={cuts[98]:.3f} ms  n={iterations}")
+    finally:
+        collection.drop()
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# Batch inserts for the /.../bulk routes.
+# The whole batch is validated first, then every valid document goes to Mongo in one
+# unordered insert_many; the report says which input positions were stored and which failed.
+from pydantic import ValidationError
+from pymongo.errors import BulkWriteError
+
+from .model import BulkItemResult, BulkInsertResult, to_document
+
+
+def prepare_batch(items: list, model, prepare=None):
+    """Validate every item against model; return (documents, their input positions, per-item results).
+
+    prepare, if given, completes each validated document before it is written (e.g. derived fields).
+    """
+    results = [None] * len(items)
+    docs, positions = [], []
+    for index, item in enumerate(items):
+        try:
+            doc = to_document(model(**item))
+            if prepare is not None:
+                doc = prepare(doc)
+        except (ValidationError, TypeError) as e:
+            results[index] = BulkItemResult(index=index, ok=False, error=str(e))
+            continue
+        docs.append(doc)
+        positions.append(index)
+    return docs, positions, results
+
+
+def report(docs, positions, results, write_errors=()) -> BulkInsertResult:
+    # writeErrors index into the list given to insert_many, not into the request body
+    failed = {error["index"]: error.get("errmsg", "write error") for error in write_errors}
+    for n, (doc, index) in enumerate(zip(docs, positions)):
+        if n in failed:
+            results[index] = BulkItemResult(index=index, ok=False, error=failed[n])
+        else:
+            results[index] = BulkItemResult(index=index, ok=True, id=str(doc["_id"]))
+    inserted = sum(1 for result in results if result.ok)
+    return BulkInsertResult(inserted=inserted, failed=len(results) - inserted, results=results)
+
+
+def insert_batch(collection, items: list, model, prepare=None) -> BulkInsertResult:
+    docs, positions, results = prepare_batch(items, model, prepare)
+    write_errors = []
+    if docs:
+        try:
+            collection.insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            write_errors = e.details.get("writeErrors", [])
+    return report(docs, positions, results, write_errors)
+
+
+async def async_insert_batch(collection, items: list, model, prepare=None) -> BulkInsertResult:
+    """Motor counterpart of insert_batch."""
+    docs, positions, results = prepare_batch(items, model, prepare)
+    write_errors = []
+    if docs:
+        try:
+            await collection.insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            write_errors = e.details.get("writeErrors", [])
+    return report(docs, positions, results, write_errors)
+
+
+def inserted_items(items: list, result: BulkInsertResult) -> list:
+    """The request items that were stored."""
+    return [items[item.index] for item in result.results if item.ok]
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# In-process response cache for the hot GET routes.
+# Entries live for a per-route TTL in a bounded LRU and are tagged with the collection
+# they were read from; any write to that collection drops them.
+import functools
+import inspect
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from fastapi import Request
+
+from .streaming import wants_ndjson
+
+CACHE_SIZE = int(os.getenv("MONGO_CACHE_SIZE", "1024"))
+COLLECTIONS = ("teams", "player_injuries", "awards", "matches", "player_transfers", "player_values")
+
+
+class ResponseCache:
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (expires_at, collection, value)
+        # bumped on every write; a result computed across a write is not stored
+        self._generations = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def generation(self, collection: str) -> int:
+        return self._generations.get(collection, 0)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, _, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, collection: str, ttl: float, generation: int):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            if self.generation(collection) != generation:
+                return
+            self._entries[key] = (time.monotonic() + ttl, collection, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, *collections: str):
+        with self._lock:
+            for collection in collections:
+                self._generations[collection] = self.generation(collection) + 1
+            stale = [key for key, (_, collection, _) in self._entries.items() if collection in collections]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+response_cache = ResponseCache(CACHE_SIZE)
+
+
+def _cache_key(request: Request):
+    # NDJSON responses are streamed from the cursor and never cached
+    if wants_ndjson(request):
+        return None
+    return request.url.path, tuple(sorted(request.query_params.multi_items()))
+
+
+def _from_cache(value, response):
+    result, headers = value
+    if response is not None:
+        response.headers.update(headers)
+    return result
+
+
+def _to_cache(result, response):
+    return result, dict(response.headers) if response is not None else {}
+
+
+def cached(collection: str, ttl: float):
+    """Cache a GET handler's result for ttl seconds, until the next write to collection."""
+    def decorator(handler):
+        if inspect.iscoroutinefunction(handler):
+            @functools.wraps(handler)
+            async def wrapper(**kwargs):
+                key = _cache_key(kwargs["request"])
+                if key is None:
+                    return await handler(**kwargs)
+                if (value := response_cache.get(key)) is not None:
+                    return _from_cache(value, kwargs.get("response"))
+                generation = response_cache.generation(collection)
+                result = await handler(**kwargs)
+                response_cache.set(key, _to_cache(result, kwargs.get("response")), collection, ttl, generation)
+                return result
+        else:
+            @functools.wraps(handler)
+            def wrapper(**kwargs):
+                key = _cache_key(kwargs["request"])
+                if key is None:
+                    return handler(**kwargs)
+                if (value := response_cache.get(key)) is not None:
+                    return _from_cache(value, kwargs.get("response"))
+                generation = response_cache.generation(collection)
+                result = handler(**kwargs)
+                response_cache.set(key, _to_cache(result, kwargs.get("response")), collection, ttl, generation)
+                return result
+        return wrapper
+    return decorator
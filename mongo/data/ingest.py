@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+# Resumable streaming ingest of CSV or NDJSON feeds of any size.
+# A feed is read record by record from its byte offset, so memory holds one batch at most.
+# After every batch is written, <feed>.checkpoint.json records the offset just past it; a run
+# after a crash seeks there and carries on. Every document's _id is derived from the feed and
+# the record's offset, so the one batch that may have been written before its checkpoint is
+# recognised by its duplicate keys instead of being inserted twice. Rows that fail cleaning
+# (populate.py), validation or the write are appended to <feed>.rejected.ndjson with the reason;
+# the checkpoint also records that file's size, so a replayed batch does not add its rejects twice.
+# Nothing is deleted first. Writing straight to Mongo, the API is then asked to drop its caches.
+#   python -m mongo.data.ingest [--collection NAME] [--batch N] [--http [BASE_URL]] [--api BASE_URL | --no-api] [--restart] FEED...
+import argparse
+import csv
+import functools
+import json
+import os
+import uuid
+
+import requests
+from pymongo import MongoClient
+from pymongo.errors import BulkWriteError
+
+from mongo.bulk import prepare_batch
+from mongo.data.loader import MODELS
+from mongo.data.populate import BASE_URL, SOURCES, RejectedRow
+from mongo.data.sync import notify_api
+
+BATCH_SIZE = 1000
+NDJSON_SUFFIXES = (".ndjson", ".jsonl")
+DUPLICATE_KEY = 11000
+# namespace of the uuid5 ids derived from (feed path, record offset)
+ID_NAMESPACE = uuid.UUID("5f0c3a52-8f7e-4c1e-9a57-2b8d0f6c4e11")
+# collection -> route of its /bulk endpoint and CSV row cleaner
+ROUTES = {collection: (path, clean) for collection, path, clean in SOURCES.values()}
+
+
+def csv_records(fd):
+    """(start offset, end offset, raw text, fields) of every CSV record from the current position."""
+    while True:
+        start = fd.tell()
+        line = fd.readline()
+        if not line:
+            return
+        # an odd number of quotes means a quoted field continues on the next line
+        while line.count(b'"') % 2 and (more := fd.readline()):
+            line += more
+        text = line.decode("utf-8-sig" if start == 0 else "utf-8")
+        fields = next(csv.reader([text]), [])
+        if fields:
+            yield start, fd.tell(), text, fields
+
+
+def ndjson_records(fd):
+    while True:
+        start = fd.tell()
+        line = fd.readline()
+        if not line:
+            return
+        text = line.decode("utf-8")
+        if text.strip():
+            yield start, fd.tell(), text, None
+
+
+def load_checkpoint(path: str) -> dict:
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as fd:
+            return json.load(fd)
+    return {"offset": 0, "rows": 0, "inserted": 0, "rejected": 0}
+
+
+def save_checkpoint(path: str, state: dict):
+    # written aside and renamed, so a crash leaves the previous checkpoint intact
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as fd:
+        json.dump(state, fd)
+        fd.flush()
+        os.fsync(fd.fileno())
+    os.replace(tmp, path)
+
+
+def write_mongo(database, collection: str, rows: list, ids: list) -> dict:
+    """Insert rows under ids; returns {position: error} of the rows rejected (duplicates are already stored)."""
+    model, prepare = MODELS[collection]
+    docs, positions, results = prepare_batch(rows, model, prepare)
+    rejected = {result.index: result.error for result in results if result is not None}
+    for doc, position in zip(docs, positions):
+        doc["_id"] = ids[position]
+    if docs:
+        try:
+            database[collection].insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            for error in e.details.get("writeErrors", []):
+                if error.get("code") != DUPLICATE_KEY:
+                    rejected[positions[error["index"]]] = error.get("errmsg", "write error")
+    return rejected
+
+
+def keeps_ids(collection: str) -> bool:
+    """Whether the /bulk route of collection stores the _id sent with each item (its model has an _id field)."""
+    return any(field.alias == "_id" for field in MODELS[collection][0].__fields__.values())
+
+
+def write_http(session, base_url: str, collection: str, rows: list, ids: list) -> dict:
+    """write_mongo through the /bulk route; only for collections that keep the ids sent (keeps_ids)."""
+    items = [{**row, "_id": str(row_id)} for row, row_id in zip(rows, ids)]
+    response = session.post(f"{base_url}/{ROUTES[collection][0]}/bulk", json=items, timeout=300)
+    response.raise_for_status()
+    return {
+        result["index"]: result["error"]
+        for result in response.json()["results"]
+        if not result["ok"] and "E11000" not in (result["error"] or "")
+    }
+
+
+class Feed:
+    def __init__(self, path: str, collection: str):
+        self.path = os.path.abspath(path)
+        self.collection = collection
+        self.ndjson = path.endswith(NDJSON_SUFFIXES)
+        self.checkpoint_path = path + ".checkpoint.json"
+        self.dead_letter_path = path + ".rejected.ndjson"
+
+    def record_id(self, offset: int) -> uuid.UUID:
+        return uuid.uuid5(ID_NAMESPACE, f"{self.path}:{offset}")
+
+    def parse(self, text: str, fields, header):
+        """Row of one record, ready for the model; raises RejectedRow when it cannot be read or cleaned."""
+        if self.ndjson:
+            try:
+                row = json.loads(text)
+            except json.JSONDecodeError as e:
+                raise RejectedRow(f"Invalid JSON: {e}")
+            if not isinstance(row, dict):
+                raise RejectedRow("Expected a JSON object")
+            return row
+        if len(fields) != len(header):
+            raise RejectedRow(f"Expected {len(header)} fields, got {len(fields)}")
+        return ROUTES[self.collection][1](dict(zip(header, fields)))
+
+
+def ingest(feed: Feed, write, batch_size: int = BATCH_SIZE, restart: bool = False) -> dict:
+    state = {"offset": 0, "rows": 0, "inserted": 0, "rejected": 0} if restart else load_checkpoint(feed.checkpoint_path)
+    if restart and os.path.exists(feed.dead_letter_path):
+        os.remove(feed.dead_letter_path)
+    if state["offset"] > os.path.getsize(feed.path):
+        raise SystemExit(f"{feed.path} is shorter than its checkpoint; run again with --restart")
+    if "dead_letter_size" in state and os.path.exists(feed.dead_letter_path):
+        # drop the rejects of a batch written after the checkpoint, it is about to be replayed
+        os.truncate(feed.dead_letter_path, min(state["dead_letter_size"], os.path.getsize(feed.dead_letter_path)))
+    with open(feed.path, "rb") as fd, open(feed.dead_letter_path, "a", encoding="utf-8") as dead_letter:
+        header = None
+        if not feed.ndjson:
+            _, header_end, _, header = next(csv_records(fd), (0, 0, "", []))
+            header = [name.strip() for name in header]
+            state["offset"] = max(state["offset"], header_end)
+        fd.seek(state["offset"])
+        records = ndjson_records(fd) if feed.ndjson else csv_records(fd)
+        batch, ids, raw, rejected = [], [], [], []
+
+        def commit(end: int):
+            failed = write(feed.collection, batch, ids) if batch else {}
+            rejected.extend((raw[position][0], raw[position][1], error) for position, error in failed.items())
+            for offset, text, error in rejected:
+                dead_letter.write(json.dumps({"offset": offset, "record": text, "error": error}, ensure_ascii=False) + "\n")
+            dead_letter.flush()
+            state["rows"] += len(batch) + len(rejected) - len(failed)
+            state["inserted"] += len(batch) - len(failed)
+            state["rejected"] += len(rejected)
+            state["offset"] = end
+            state["dead_letter_size"] = dead_letter.tell()
+            save_checkpoint(feed.checkpoint_path, state)
+            print(f"{os.path.basename(feed.path)}: {state['rows']} rows, {state['inserted']} written, "
+                  f"{state['rejected']} rejected, offset {end}")
+            for pending in (batch, ids, raw, rejected):
+                pending.clear()
+
+        end = state["offset"]
+        for start, end, text, fields in records:
+            try:
+                batch.append(feed.parse(text, fields, header))
+            except RejectedRow as e:
+                rejected.append((start, text, str(e)))
+            else:
+                ids.append(feed.record_id(start))
+                raw.append((start, text))
+            if len(batch) + len(rejected) >= batch_size:
+                commit(end)
+        if batch or rejected or end != state["offset"]:
+            commit(end)
+    return state
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resumable ingest of CSV/NDJSON feeds into Mongo")
+    parser.add_argument("feeds", nargs="+")
+    parser.add_argument("--collection", choices=sorted(MODELS), help="target collection (default: from the CSV file name)")
+    parser.add_argument("--batch", type=int, default=BATCH_SIZE, help="records per write and checkpoint")
+    parser.add_argument("--http", nargs="?", const=BASE_URL, metavar="BASE_URL",
+                        help="write through the API's /bulk routes instead of to Mongo")
+    parser.add_argument("--restart", action="store_true", help="ignore the checkpoints and start from the beginning")
+    parser.add_argument("--api", default=BASE_URL, help="API whose caches are invalidated after writing to Mongo")
+    parser.add_argument("--no-api", action="store_true", help="do not contact the API")
+    args = parser.parse_args()
+
+    feeds = []
+    for path in args.feeds:
+        collection = args.collection or SOURCES.get(os.path.basename(path), (None,))[0]
+        if collection is None:
+            parser.error(f"cannot tell the collection of {path}; pass --collection")
+        if args.http and not keeps_ids(collection):
+            # the route would drop the derived _id, so a replayed batch would be inserted twice
+            parser.error(f"{collection} cannot be resumed through --http, its /bulk route assigns new ids; write to Mongo instead")
+        feeds.append(Feed(path, collection))
+
+    if args.http:
+        with requests.Session() as session:
+            for feed in feeds:
+                ingest(feed, functools.partial(write_http, session, args.http), args.batch, args.restart)
+    else:
+        client = MongoClient(os.getenv("MONGO_URI", "mongodb://localhost:27017"), uuidRepresentation="standard")
+        database = client[os.getenv("MONGO_DB_NAME", "football_db")]
+        try:
+            for feed in feeds:
+                ingest(feed, functools.partial(write_mongo, database), args.batch, args.restart)
+        finally:
+            client.close()
+        # the API did not see these writes; its cached responses, ETags and in-memory indexes are stale
+        if not args.no_api:
+            notify_api(args.api, sorted({feed.collection for feed in feeds}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# Bulk loader for the mongo/data CSVs.
+# Every file is read in chunks and the chunks of all six files are interleaved over a process
+# pool, so the collections load concurrently and parsing/validation uses every core. By default
+# each worker cleans its chunk (populate.py), validates it with the API models and writes it
+# straight to Mongo with one unordered insert_many (mongo/bulk.py), like the /bulk routes do.
+# --http posts the chunks to the /bulk routes of a remote API instead.
+#   python -m mongo.data.loader [--http [BASE_URL]] [--chunk N] [--workers N] [--keep] [data_dir]
+import argparse
+import csv
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from itertools import islice
+
+import requests
+from pymongo import MongoClient
+from requests.adapters import HTTPAdapter
+
+from mongo.bulk import insert_batch
+from mongo.data.populate import BASE_URL, SOURCES, clean_rows
+from mongo.match_stats import with_match_stats
+from mongo.model import Team, PlayerInjuries, Awards, Matches, PlayerTransfers, PlayerValues
+from mongo.values import with_value_stats
+
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+CHUNK_SIZE = 5000
+# collection -> (model, prepare) as used by the /bulk routes
+MODELS = {
+    "teams": (Team, None),
+    "player_injuries": (PlayerInjuries, None),
+    "awards": (Awards, None),
+    "matches": (Matches, with_match_stats),
+    "player_transfers": (PlayerTransfers, None),
+    "player_values": (PlayerValues, with_value_stats),
+}
+
+_database = None  # per worker process
+
+
+def _init_worker(uri: str, db_name: str):
+    global _database
+    _database = MongoClient(uri, uuidRepresentation="standard")[db_name]
+
+
+def load_chunk(filename: str, rows: list):
+    """Worker: clean, validate and insert one chunk; returns (filename, rows read, inserted, failed)."""
+    collection, _, clean = SOURCES[filename]
+    model, prepare = MODELS[collection]
+    cleaned = clean_rows(rows, clean)
+    result = insert_batch(_database[collection], cleaned, model, prepare)
+    return filename, len(rows), result.inserted, len(rows) - result.inserted
+
+
+def post_chunk(session, base_url: str, filename: str, rows: list):
+    """--http: clean one chunk and post it to the collection's /bulk route."""
+    _, path, clean = SOURCES[filename]
+    cleaned = clean_rows(rows, clean)
+    inserted = 0
+    if cleaned:
+        try:
+            response = session.post(f"{base_url}/{path}/bulk", json=cleaned, timeout=300)
+            response.raise_for_status()
+            inserted = response.json()["inserted"]
+        except requests.exceptions.RequestException as e:
+            print(f"Failed to post {len(cleaned)} rows of {filename}: {e}")
+    return filename, len(rows), inserted, len(rows) - inserted
+
+
+def read_chunks(path: str, chunk_size: int):
+    with open(path, "r", encoding="utf-8", newline="") as fd:
+        reader = csv.DictReader(fd)
+        while chunk := list(islice(reader, chunk_size)):
+            yield chunk
+
+
+def interleave(chunk_sources: dict):
+    """(filename, chunk) pairs taking one chunk of every file in turn."""
+    pending = dict(chunk_sources)
+    while pending:
+        for filename, chunks in list(pending.items()):
+            chunk = next(chunks, None)
+            if chunk is None:
+                del pending[filename]
+            else:
+                yield filename, chunk
+
+
+def run(executor, load, chunks, max_pending: int, report, *args):
+    """Run load(*args, filename, chunk) for every chunk with at most max_pending in flight, reporting each one."""
+    pending = set()
+    for filename, chunk in chunks:
+        if len(pending) >= max_pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                report(*future.result())
+        pending.add(executor.submit(load, *args, filename, chunk))
+    for future in wait(pending).done:
+        report(*future.result())
+
+
+class Progress:
+    def __init__(self, filenames):
+        self.started = time.perf_counter()
+        self.totals = {filename: [0, 0, 0, None] for filename in filenames}  # read, inserted, failed, finished at
+
+    def __call__(self, filename, read, inserted, failed):
+        totals = self.totals[filename]
+        totals[0] += read
+        totals[1] += inserted
+        totals[2] += failed
+        totals[3] = time.perf_counter()
+
+    def print_summary(self):
+        elapsed = time.perf_counter() - self.started
+        for filename, (read, inserted, failed, finished) in self.totals.items():
+            seconds = (finished or self.started) - self.started
+            rate = read / seconds if seconds > 0 else 0
+            print(f"{filename:20} {read:>10} rows {inserted:>10} inserted {failed:>8} failed {rate:>12,.0f} rows/s")
+        read = sum(totals[0] for totals in self.totals.values())
+        print(f"{'total':20} {read:>10} rows in {elapsed:.2f} s, {read / elapsed if elapsed else 0:,.0f} rows/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load the mongo/data CSVs into Mongo")
+    parser.add_argument("data_dir", nargs="?", default=DATA_DIR)
+    parser.add_argument("--http", nargs="?", const=BASE_URL, metavar="BASE_URL",
+                        help="post through the API's /bulk routes instead of writing to Mongo")
+    parser.add_argument("--chunk", type=int, default=CHUNK_SIZE, help="rows per insert_many / request")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4)
+    parser.add_argument("--keep", action="store_true", help="do not delete the existing documents first")
+    args = parser.parse_args()
+
+    filenames = [filename for filename in SOURCES if os.path.exists(os.path.join(args.data_dir, filename))]
+    chunks = interleave({filename: read_chunks(os.path.join(args.data_dir, filename), args.chunk) for filename in filenames})
+    progress = Progress(filenames)
+    if args.http:
+        with requests.Session() as session:
+            session.mount("http://", HTTPAdapter(pool_maxsize=args.workers))
+            session.mount("https://", HTTPAdapter(pool_maxsize=args.workers))
+            if not args.keep:
+                session.delete(f"{args.http}/all").raise_for_status()
+            progress.started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=args.workers) as executor:
+                run(executor, post_chunk, chunks, 2 * args.workers, progress, session, args.http)
+    else:
+        uri = os.getenv("MONGO_URI", "mongodb://localhost:27017")
+        db_name = os.getenv("MONGO_DB_NAME", "football_db")
+        if not args.keep:
+            with MongoClient(uri) as client:
+                for filename in filenames:
+                    client[db_name][SOURCES[filename][0]].delete_many({})
+        progress.started = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker, initargs=(uri, db_name)) as executor:
+            run(executor, load_chunk, chunks, 2 * args.workers, progress)
+        # the API's caches (responses, ETags, autocomplete, injury tree) did not see these writes
+        print("Loaded directly into Mongo; restart a running API to refresh its in-memory indexes")
+    progress.print_summary()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,32 +1,15 @@
-import csv
-import json
 import requests
-from datetime import datetime
-
-BASE_URL = "http://localhost:8000"
 
+from populate import BASE_URL, post_bulk, read_rows
 
 
 def main():
     response = requests.delete(f"{BASE_URL}/all")
-    with open("transfers.csv", "r", encoding="utf-8") as fd:
-        transfers = csv.DictReader(fd)
-        print(transfers)
-        for transfer in transfers:
-            try:
-                transfer['transfer_date'] = datetime.strptime(transfer['transfer_date'], '%Y-%m-%d').isoformat()
-            except KeyError:
-                pass
-            except ValueError:
-                print(f"Error al convertir la fecha para la transferencia: {transfer['player_name']}")
-                continue
-            response = requests.post(f"{BASE_URL}/player_transfers", json=transfer)
-            print(response)
-            if not response.ok:
-                print(f"Failed to post transfer: {response.json()}")
+    # same cleaning as populate.py, posted through /player_transfers/bulk
+    post_bulk("player_transfers", read_rows("transfers.csv"))
 
 
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
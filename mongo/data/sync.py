@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# Incremental sync of the mongo/data CSVs, instead of DELETE /all and a full reload.
+# Every row is cleaned (populate.py) and validated like the /bulk routes do, and identified by
+# its natural key (NATURAL_KEYS). Stored documents carry sync_hash, a hash of their content, so
+# one scan of the keys and hashes tells which rows are new (upserted on the key), changed
+# (replaced in place, same _id) or gone (deleted); unchanged rows are not written at all.
+# Collections are never emptied, so readers see the old or the new document, never a gap.
+# The running API is then asked to drop its cached responses and in-memory indexes.
+#   python -m mongo.data.sync [--dry-run] [--api BASE_URL | --no-api] [data_dir]
+import argparse
+import hashlib
+import os
+
+import requests
+from bson import json_util
+from pymongo import DeleteOne, MongoClient, ReplaceOne
+
+from mongo.bulk import prepare_batch
+from mongo.data.loader import DATA_DIR, MODELS
+from mongo.data.populate import BASE_URL, SOURCES, read_rows
+
+# collection -> fields identifying a row across reloads
+NATURAL_KEYS = {
+    "teams": ("team_name",),
+    "player_injuries": ("player_name", "injury_type", "start_date"),
+    "awards": ("recipient_name", "award_name", "season"),
+    "matches": ("home_team_name", "away_team_name", "date"),
+    "player_transfers": ("player_name", "transfer_date"),
+    "player_values": ("player_name",),
+}
+HASH_FIELD = "sync_hash"
+WRITE_BATCH = 1000
+
+
+def natural_key(doc: dict, fields) -> tuple:
+    # json_util makes dates and nested values hashable and compares them by value
+    return tuple(json_util.dumps(doc.get(field)) for field in fields)
+
+
+def content_hash(doc: dict) -> str:
+    # _id is generated per run, so it is not content
+    content = {key: value for key, value in doc.items() if key not in ("_id", HASH_FIELD)}
+    return hashlib.sha256(json_util.dumps(content, sort_keys=True).encode()).hexdigest()
+
+
+def plan(docs: list, stored, key_fields) -> tuple:
+    """Write operations turning the stored documents (keys and hashes) into docs; returns (operations, counts)."""
+    counts = {"inserted": 0, "updated": 0, "deleted": 0, "unchanged": 0}
+    current, extra_copies = {}, []
+    for doc in stored:
+        key = natural_key(doc, key_fields)
+        if key in current:
+            # left behind by earlier wipe-and-reload runs that overlapped
+            extra_copies.append(doc["_id"])
+        else:
+            current[key] = doc
+    wanted = {}
+    for doc in docs:
+        doc[HASH_FIELD] = content_hash(doc)
+        # the last row of a key wins, as it would have with a full reload
+        wanted[natural_key(doc, key_fields)] = doc
+    operations = []
+    for key, doc in wanted.items():
+        old = current.get(key)
+        if old is None:
+            operations.append(ReplaceOne({field: doc.get(field) for field in key_fields}, doc, upsert=True))
+            counts["inserted"] += 1
+        elif old.get(HASH_FIELD) != doc[HASH_FIELD]:
+            # a replacement without _id keeps the stored one
+            operations.append(ReplaceOne({"_id": old["_id"]}, {k: v for k, v in doc.items() if k != "_id"}))
+            counts["updated"] += 1
+        else:
+            counts["unchanged"] += 1
+    for key, old in current.items():
+        if key not in wanted:
+            operations.append(DeleteOne({"_id": old["_id"]}))
+            counts["deleted"] += 1
+    operations.extend(DeleteOne({"_id": _id}) for _id in extra_copies)
+    counts["deleted"] += len(extra_copies)
+    return operations, counts
+
+
+def sync_collection(database, collection: str, rows: list, dry_run: bool = False) -> dict:
+    model, prepare = MODELS[collection]
+    key_fields = NATURAL_KEYS[collection]
+    docs, _, results = prepare_batch(rows, model, prepare)
+    for result in results:
+        if result is not None:
+            print(f"{collection} row {result.index} rejected: {result.error}")
+    stored = database[collection].find({}, {**{field: 1 for field in key_fields}, HASH_FIELD: 1})
+    operations, counts = plan(docs, stored, key_fields)
+    counts["rejected"] = sum(1 for result in results if result is not None)
+    if not dry_run:
+        for start in range(0, len(operations), WRITE_BATCH):
+            database[collection].bulk_write(operations[start:start + WRITE_BATCH], ordered=False)
+    return counts
+
+
+def notify_api(base_url: str, collections: list):
+    try:
+        response = requests.post(f"{base_url}/cache/invalidate", params={"collection": collections}, timeout=30)
+        response.raise_for_status()
+    except requests.exceptions.RequestException as e:
+        print(f"Could not reach the API at {base_url} to invalidate its caches ({e}); restart it to see the changes")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sync the mongo/data CSVs into Mongo, writing only the differences")
+    parser.add_argument("data_dir", nargs="?", default=DATA_DIR)
+    parser.add_argument("--dry-run", action="store_true", help="report the differences without writing them")
+    parser.add_argument("--api", default=BASE_URL, help="API whose caches are invalidated afterwards")
+    parser.add_argument("--no-api", action="store_true", help="do not contact the API")
+    args = parser.parse_args()
+
+    client = MongoClient(os.getenv("MONGO_URI", "mongodb://localhost:27017"), uuidRepresentation="standard")
+    database = client[os.getenv("MONGO_DB_NAME", "football_db")]
+    changed = []
+    try:
+        for filename, (collection, _, _) in SOURCES.items():
+            if not os.path.exists(os.path.join(args.data_dir, filename)):
+                continue
+            counts = sync_collection(database, collection, read_rows(filename, args.data_dir), args.dry_run)
+            print(f"{collection:18} " + " ".join(f"{name}={count}" for name, count in counts.items()))
+            if counts["inserted"] or counts["updated"] or counts["deleted"]:
+                changed.append(collection)
+    finally:
+        client.close()
+    if changed and not args.dry_run and not args.no_api:
+        notify_api(args.api, changed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# Conditional GETs for the Mongo routes.
+# The ETag of a response is derived from the version of the collection it reads (bumped by
+# every write, see cache.ResponseCache.invalidate) and from the request itself, so a matching
+# If-None-Match is answered with 304 before the handler, and Mongo, is reached.
+# Versions are kept per process: with several workers a write only bumps the worker serving it.
+import functools
+import hashlib
+import inspect
+import uuid
+
+from fastapi import Request, Response, status
+
+from .cache import response_cache
+
+# Distinguishes ETags of this process from those handed out before a restart
+EPOCH = uuid.uuid4().hex[:8]
+
+
+def make_etag(request: Request, collection: str, vary=None) -> str:
+    representation = repr((request.url.path, sorted(request.query_params.multi_items()), request.headers.get("accept", ""),
+                           vary(request) if vary is not None else None))
+    digest = hashlib.sha1(representation.encode()).hexdigest()[:16]
+    return f'W/"{EPOCH}-{response_cache.generation(collection)}-{digest}"'
+
+
+def not_modified(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [candidate.strip() for candidate in header.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+def _tag(result, response: Response, etag: str):
+    response.headers["ETag"] = etag
+    if isinstance(result, Response):
+        result.headers["ETag"] = etag
+    return result
+
+
+def conditional(collection: str, vary=None):
+    """Answer If-None-Match with 304 while collection has not been written since the ETag was issued.
+
+    vary(request), if given, returns what else the response depends on (e.g. the current day); it is part of the ETag.
+    """
+    def decorator(handler):
+        if inspect.iscoroutinefunction(handler):
+            @functools.wraps(handler)
+            async def wrapper(**kwargs):
+                etag = make_etag(kwargs["request"], collection, vary)
+                if not_modified(kwargs["request"], etag):
+                    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+                return _tag(await handler(**kwargs), kwargs["response"], etag)
+        else:
+            @functools.wraps(handler)
+            def wrapper(**kwargs):
+                etag = make_etag(kwargs["request"], collection, vary)
+                if not_modified(kwargs["request"], etag):
+                    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+                return _tag(handler(**kwargs), kwargs["response"], etag)
+        return wrapper
+    return decorator
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# Declarative index spec and the reconciler applying it at startup.
+# The spec is diffed against list_indexes(): only missing indexes are built, indexes no longer
+# in the spec are dropped once the new ones exist, and nothing is rebuilt when the two agree.
+# The reconciler runs in a background thread so startup never waits for an index build.
+import threading
+import time
+
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
+from pymongo.errors import PyMongoError
+
+# TEXT indexes only serve $text queries; the equality lookups of the routes need the ascending ones
+INDEX_SPEC = {
+    "teams": [
+        IndexModel([("team_name", TEXT)], name="team_name_text"),
+        IndexModel([("team_name", ASCENDING)], name="team_name_1"),
+    ],
+    "matches": [
+        # date + _id backs the keyset pagination order of the match list routes
+        IndexModel([("date", ASCENDING), ("_id", ASCENDING)], name="date_1__id_1"),
+        # /matches and /upcoming_matches: equality on status, then the pagination order
+        IndexModel([("status", ASCENDING), ("date", ASCENDING), ("_id", ASCENDING)], name="status_1_date_1__id_1"),
+        # /matches_team*: one index per $or branch so each branch is an index scan
+        IndexModel([("home_team_name", ASCENDING), ("date", ASCENDING), ("_id", ASCENDING)], name="home_team_name_1_date_1__id_1"),
+        IndexModel([("away_team_name", ASCENDING), ("date", ASCENDING), ("_id", ASCENDING)], name="away_team_name_1_date_1__id_1"),
+        # /matches_stats: goals and shots parsed at ingest (mongo/match_stats.py); a clean sheet is an $or over the two
+        # goal indexes, min_goal_difference a range on goal_difference
+        IndexModel([("home_goals", ASCENDING)], name="home_goals_1"),
+        IndexModel([("away_goals", ASCENDING)], name="away_goals_1"),
+        IndexModel([("goal_difference", ASCENDING)], name="goal_difference_1"),
+        IndexModel([("stats.shots", ASCENDING)], name="stats.shots_1"),
+        # /matches/head_to_head: one equality on the ordered pair, newest first
+        IndexModel([("team_pair", ASCENDING), ("date", DESCENDING), ("_id", DESCENDING)], name="team_pair_1_date_-1__id_-1"),
+        # Combine all text fields into a single text index
+        IndexModel([("home_team_name", TEXT), ("away_team_name", TEXT), ("status", TEXT)], name="matches_text_search"),
+    ],
+    "player_injuries": [
+        IndexModel([("player_name", TEXT), ("team_name", TEXT), ("status", TEXT)], name="injuries_text_search"),
+        IndexModel([("player_name", ASCENDING)], name="player_name_1"),
+        # /player_injuries/active: team equality, then the interval bounds as index ranges
+        IndexModel([("team_name", ASCENDING), ("start_date", ASCENDING), ("end_date", ASCENDING)], name="team_name_1_start_date_1_end_date_1"),
+    ],
+    "player_transfers": [
+        IndexModel([("player_name", TEXT), ("from_team_name", TEXT), ("team_name", TEXT)], name="transfers_text_search"),
+        IndexModel([("transfer_date", DESCENDING), ("_id", DESCENDING)], name="transfer_date_-1__id_-1"),
+        IndexModel([("player_name", ASCENDING), ("transfer_date", DESCENDING), ("_id", DESCENDING)], name="player_name_1_transfer_date_-1__id_-1"),
+    ],
+    "awards": [
+        IndexModel([("recipient_name", TEXT), ("award_name", TEXT)], name="awards_text_search"),
+        IndexModel([("season", ASCENDING), ("_id", ASCENDING)], name="season_1__id_1"),
+        IndexModel([("recipient_name", ASCENDING), ("season", ASCENDING), ("_id", ASCENDING)], name="recipient_name_1_season_1__id_1"),
+    ],
+    "player_values": [
+        IndexModel([("player_name", TEXT)], name="player_name_text"),
+        IndexModel([("player_name", ASCENDING)], name="player_name_1"),
+    ],
+}
+
+
+def _same_key(existing: dict, wanted: IndexModel) -> bool:
+    keys = list(wanted.document["key"].items())
+    text_fields = {field for field, kind in keys if kind == TEXT}
+    if text_fields:
+        # text indexes are listed as {_fts: "text", _ftsx: 1} with the fields in "weights"
+        return set(existing.get("weights", {})) == text_fields
+    return list(existing["key"].items()) == keys
+
+
+def plan(database, spec=INDEX_SPEC):
+    """Return ({collection: [IndexModel to build]}, {collection: [index names to drop]})."""
+    to_create, to_drop = {}, {}
+    for collection, wanted in spec.items():
+        existing = {index["name"]: index for index in database[collection].list_indexes()}
+        wanted_names = {model.document["name"] for model in wanted}
+        for model in wanted:
+            name = model.document["name"]
+            if name in existing and _same_key(existing[name], model):
+                continue
+            if name in existing:
+                # same name, different definition: it has to go before the new one can be built
+                to_drop.setdefault(collection, []).append(name)
+            to_create.setdefault(collection, []).append(model)
+        for name in existing:
+            if name != "_id_" and name not in wanted_names:
+                to_drop.setdefault(collection, []).append(name)
+    return to_create, to_drop
+
+
+class IndexReconciler:
+    def __init__(self, database, spec=INDEX_SPEC):
+        self.database = database
+        self.spec = spec
+        self.state = "pending"
+        self.indexes = {}  # "collection.name" -> pending | building | ready | dropped | failed: ...
+        self.started_at = None
+        self.finished_at = None
+        self._thread = None
+        # the reconciler thread writes indexes while /admin/indexes copies it
+        self._lock = threading.Lock()
+
+    def start(self):
+        self._thread = threading.Thread(target=self.run, name="index-reconciler", daemon=True)
+        self._thread.start()
+
+    def _set(self, key: str, status: str):
+        with self._lock:
+            self.indexes[key] = status
+
+    def run(self):
+        self.started_at = time.time()
+        self.state = "running"
+        try:
+            to_create, to_drop = plan(self.database, self.spec)
+            for collection, models in self.spec.items():
+                for model in models:
+                    self._set(f"{collection}.{model.document['name']}", "ready")
+            for collection, models in to_create.items():
+                for model in models:
+                    self._set(f"{collection}.{model.document['name']}", "pending")
+            # redefined indexes are dropped first, plain stale ones only after the new ones are built
+            redefined = {collection: [model.document["name"] for model in models] for collection, models in to_create.items()}
+            for collection, names in to_drop.items():
+                for name in names:
+                    if name in redefined.get(collection, []):
+                        self._drop(collection, name)
+            for collection, models in to_create.items():
+                for model in models:
+                    self._build(collection, model)
+            for collection, names in to_drop.items():
+                for name in names:
+                    if name not in redefined.get(collection, []):
+                        self._drop(collection, name)
+            self.state = "done"
+        except PyMongoError as e:
+            self.state = f"failed: {e}"
+        finally:
+            self.finished_at = time.time()
+        print(f"Index reconciliation {self.state}")
+
+    def _build(self, collection: str, model: IndexModel):
+        key = f"{collection}.{model.document['name']}"
+        self._set(key, "building")
+        try:
+            self.database[collection].create_indexes([model])
+            self._set(key, "ready")
+        except PyMongoError as e:
+            self._set(key, f"failed: {e}")
+
+    def _drop(self, collection: str, name: str):
+        key = f"{collection}.{name}"
+        try:
+            self.database[collection].drop_index(name)
+        except PyMongoError as e:
+            self._set(key, f"failed: {e}")
+            return
+        # a redefined index keeps its pending state until it is rebuilt
+        with self._lock:
+            self.indexes.setdefault(key, "dropped")
+
+    def progress(self) -> dict:
+        with self._lock:
+            indexes = dict(self.indexes)
+        return {
+            "state": self.state,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "indexes": indexes,
+            "builds": index_builds(self.database),
+        }
+
+
+def index_builds(database) -> list:
+    """Index builds currently running on the server, with the progress Mongo reports for them."""
+    try:
+        ops = database.client.admin.command({"currentOp": 1, "command.createIndexes": {"$exists": True}})
+    except PyMongoError:
+        return []
+    return [
+        {
+            "collection": op["command"].get("createIndexes"),
+            "indexes": [index.get("name") for index in op["command"].get("indexes", [])],
+            "msg": op.get("msg"),
+            "progress": op.get("progress"),
+            "secs_running": op.get("secs_running"),
+        }
+        for op in ops.get("inprog", [])
+    ]
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# In-memory interval tree over every injury's [start_date, end_date], for availability reports:
+# the injuries active at time t for all teams at once are a stab query, O(log n + k), with no
+# Mongo round trip. Loaded at startup (main.py); injury writes invalidate it and the next query
+# reloads the collection. Per-team questions go to Mongo instead, through the
+# team_name, start_date, end_date index (GET /player_injuries/active).
+import threading
+from datetime import datetime, timezone
+
+
+def naive_utc(moment: datetime) -> datetime:
+    # Mongo hands back naive UTC datetimes; an aware query time would not compare with them
+    if moment.tzinfo is None:
+        return moment
+    return moment.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def today() -> datetime:
+    """Start of the current UTC day, the moment of the active injury queries when none is given."""
+    return datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def default_day(request) -> str:
+    # ETag part of those queries: without ?on= their answer changes with the day, not only with writes
+    return "" if "on" in request.query_params else today().date().isoformat()
+
+
+class _Node:
+    __slots__ = ("center", "by_start", "by_end", "left", "right")
+
+    def __init__(self, center, here, left, right):
+        self.center = center
+        self.by_start = sorted(here, key=lambda interval: interval[0])
+        self.by_end = sorted(here, key=lambda interval: interval[1], reverse=True)
+        self.left = left
+        self.right = right
+
+
+def build_tree(intervals: list):
+    """Centered interval tree of (start, end, doc) tuples, ends inclusive."""
+    if not intervals:
+        return None
+    points = sorted(point for start, end, _ in intervals for point in (start, end))
+    center = points[len(points) // 2]
+    left = [interval for interval in intervals if interval[1] < center]
+    right = [interval for interval in intervals if interval[0] > center]
+    here = [interval for interval in intervals if interval[0] <= center <= interval[1]]
+    return _Node(center, here, build_tree(left), build_tree(right))
+
+
+def stab(node, moment) -> list:
+    """Docs of the intervals containing moment."""
+    found = []
+    while node is not None:
+        if moment < node.center:
+            # every interval here ends at or after center, so only the start has to be checked
+            for start, _, doc in node.by_start:
+                if start > moment:
+                    break
+                found.append(doc)
+            node = node.left
+        elif moment > node.center:
+            for _, end, doc in node.by_end:
+                if end < moment:
+                    break
+                found.append(doc)
+            node = node.right
+        else:
+            found.extend(doc for _, _, doc in node.by_start)
+            break
+    return found
+
+
+def _interval(doc: dict):
+    start, end = doc.get("start_date"), doc.get("end_date")
+    # documents still holding ISO strings (see mongo.migrations.dates) are left out
+    if not isinstance(start, datetime) or not isinstance(end, datetime):
+        return None
+    start, end = naive_utc(start), naive_utc(end)
+    return min(start, end), max(start, end), doc
+
+
+class InjuryIntervals:
+    def __init__(self):
+        self._tree = None
+        self._size = 0
+        # bumped by every injury write; the tree is rebuilt when it lags behind
+        self._generation = 0
+        self._loaded_generation = -1
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._size
+
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+
+    def load(self, database):
+        with self._lock:
+            generation = self._generation
+        intervals = [interval for interval in map(_interval, database["player_injuries"].find({})) if interval is not None]
+        tree = build_tree(intervals)
+        with self._lock:
+            # a slower reload that started before a newer one must not overwrite it
+            if generation > self._loaded_generation:
+                self._tree, self._size, self._loaded_generation = tree, len(intervals), generation
+
+    def active(self, database, moment: datetime) -> list:
+        """Injuries with start_date <= moment <= end_date, reloading the tree after a write."""
+        if self._loaded_generation != self._generation:
+            self.load(database)
+        return stab(self._tree, naive_utc(moment))
+
+    def active_by_team(self, database, moment: datetime) -> dict:
+        by_team = {}
+        for doc in self.active(database, moment):
+            by_team.setdefault(doc.get("team_name"), []).append(doc)
+        return by_team
+
+
+injury_intervals = InjuryIntervals()
@@ -1,9 +1,44 @@
 import requests
 import os
+import json
 import datetime
+from urllib.parse import quote
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 
 MONGO_BASE_URL = "http://localhost:8000"
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+class ApiClient:
+    """Keep-alive session shared by every query: connections to the API are pooled and reused
+    instead of opened per request, with timeouts and retries with exponential backoff."""
+
+    def __init__(self, pool_size=10, connect_timeout=3.05, read_timeout=30, retries=3, backoff=0.3):
+        self.timeout = (connect_timeout, read_timeout)
+        retry = Retry(total=retries, backoff_factor=backoff, status_forcelist=(502, 503, 504),
+                      allowed_methods=frozenset(["GET", "HEAD"]))
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def get(self, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session.get(url, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+
+api_client = ApiClient(
+    pool_size=int(os.getenv("MONGO_API_POOL_SIZE", "10")),
+    connect_timeout=float(os.getenv("MONGO_API_CONNECT_TIMEOUT", "3.05")),
+    read_timeout=float(os.getenv("MONGO_API_READ_TIMEOUT", "30")),
+    retries=int(os.getenv("MONGO_API_RETRIES", "3")),
+    backoff=float(os.getenv("MONGO_API_BACKOFF", "0.3")),
+)
 
 
 functions = {"1": "Match History",
@@ -17,7 +52,11 @@ functions = {"1": "Match History",
                "9":"Awards by: ",
              "10":"Player Value",
              "11":"Match Officials",
-               "12":"Exit"}
+               "12":"Exit",
+             "13":"Team Form",
+             "14":"Standings",
+             "15":"Head to Head",
+             "16":"Squad Report"}
 
 
 def main():
@@ -56,26 +95,98 @@ def main():
             match_officials()
         elif choice == '12':
             exit()
+        elif choice == '13':
+            team = input("Enter the team name: ")
+            team_form(team)
+        elif choice == '14':
+            standings()
+        elif choice == '15':
+            team_a = input("Enter the first team name: ")
+            team_b = input("Enter the second team name: ")
+            head_to_head(team_a, team_b)
+        elif choice == '16':
+            players = input("Enter the player names, separated by commas: ")
+            squad_report([player.strip() for player in players.split(",") if player.strip()])
+
+
+
+# Last ETag and body seen per request; repeat calls send If-None-Match and replay the body on a 304
+_validators = {}
+# Streams longer than this are not kept for replay, so memory stays flat for full collections
+STREAM_CACHE_MAX_DOCUMENTS = int(os.getenv("MONGO_API_STREAM_CACHE_MAX", "1000"))
 
 
+def _validator_key(endpoint, params, accept=None):
+    items = ((name, tuple(value) if isinstance(value, list) else value) for name, value in (params or {}).items())
+    return endpoint, tuple(sorted(items)), accept
+
+
+def cached_get(endpoint, params=None):
+    key = _validator_key(endpoint, params)
+    cached = _validators.get(key)
+    headers = {"If-None-Match": cached.headers["ETag"]} if cached is not None else {}
+    response = api_client.get(endpoint, params=params, headers=headers)
+    if response.status_code == 304 and cached is not None:
+        return cached
+    if response.ok and "ETag" in response.headers:
+        _validators[key] = response
+    return response
+
+
+def stream_documents(endpoint, params=None):
+    # Ask for NDJSON and yield each document as soon as its line arrives
+    key = _validator_key(endpoint, params, NDJSON_MEDIA_TYPE)
+    cached = _validators.get(key)
+    headers = {"Accept": NDJSON_MEDIA_TYPE}
+    if cached is not None:
+        headers["If-None-Match"] = cached[0]
+    with api_client.get(endpoint, params=params, headers=headers, stream=True) as response:
+        if response.status_code == 304 and cached is not None:
+            yield from cached[1]
+            return
+        response.raise_for_status()
+        _validators.pop(key, None)
+        documents = []
+        for line in response.iter_lines():
+            if line:
+                document = json.loads(line)
+                if documents is not None:
+                    documents.append(document)
+                    if len(documents) > STREAM_CACHE_MAX_DOCUMENTS:
+                        documents = None
+                yield document
+        if documents is not None and "ETag" in response.headers:
+            _validators[key] = (response.headers["ETag"], documents)
+
 
 def match_history():
     suffix = "/matches"
     endpoint = MONGO_BASE_URL + suffix
-    response = requests.get(endpoint)
-    if response.ok:
+    try:
         print("="*50)
-        json_data = response.json()
-        for data in json_data:
-            officials =",".join( data.get("officials",[]))
-            statistics = ",".join(data.get("statistics",[]))
+        for data in stream_documents(endpoint):
+            officials =",".join( data.get("officials") or [])
+            statistics = ",".join(data.get("statistics") or [])
             print(f"Home team name: "+data.get("home_team_name")+" Away Team"+data.get("away_team_name")+" Date: "+data.get("date"))
             print(f' Officials: {officials}')
-            print(f"Score: "+data.get("score"))
+            print(f"Score: {data.get('score')}")
             print(f' Statistics: {statistics}')
             print("="*50)
-    else:
-        print(f"Error: {response.status_code}")
+    except requests.exceptions.RequestException as e:
+        print(f"Error: {e}")
+
+
+def suggest_names(name, kind=None):
+    # Close names known to the server, e.g. "Jose" -> "José Lozano"
+    params = {"q": name}
+    if kind:
+        params["kind"] = kind
+    try:
+        response = cached_get(MONGO_BASE_URL + "/autocomplete", params=params)
+    except requests.exceptions.RequestException:
+        return
+    if response.ok and response.json():
+        print("Did you mean: " + ", ".join(item["name"] for item in response.json()))
 
 
 def player_injuries(player):
@@ -83,7 +194,7 @@ def player_injuries(player):
     endpoint = MONGO_BASE_URL + suffix
     params = {"player_name": player}
     print(params)
-    response = requests.get(endpoint, params=params)
+    response = cached_get(endpoint, params=params)
     if response.ok:
         json_data = response.json()
         #print json keys
@@ -96,23 +207,22 @@ def player_injuries(player):
         print("="*50)
     else:
         print(f"Error: {response.status_code}")
+        if response.status_code == 404:
+            suggest_names(player, "player")
 
 
 def get_past_matches(limit: int = 5):
     suffix = "/matches"
     endpoint = MONGO_BASE_URL + suffix
-    today = datetime.now().isoformat()
-    
+    # filtered, sorted and cut to limit by the server
     params = {
-        "query": {
-            "date": {"$lt": today},
-            "status": "Finished"
-        },
-        "sort": {"date": -1},
+        "before": datetime.datetime.now().isoformat(),
+        "status": "Finished",
+        "sort": "-date",
         "limit": limit
     }
     try:
-        response = requests.get(endpoint, params=params)
+        response = api_client.get(endpoint, params=params)
         if response.ok:
             return response.json()
         else:
@@ -126,20 +236,13 @@ def get_past_matches(limit: int = 5):
 def getTeams():
     suffix = "/teams"
     endpoint = MONGO_BASE_URL + suffix
+    params = {"fields": "team_name,email,owner"}
     try:
-        response = requests.get(endpoint)
-        if response.ok:
-             #imprimir el nombre de las keys
-            json_response = response.json()
-            for responses in range(len(json_response)):
-                print(f"Team name: "+str(json_response[responses].get("team_name")))
-                print(f"Email: "+json_response[responses].get("email"))
-                print(f"Owner: "+json_response[responses].get("owner"))
-                print("="*50)
-        else:
-            print(f"Error fetching matches: {response.status_code}")
-            return None
-            
+        for team in stream_documents(endpoint, params=params):
+            print(f"Team name: "+str(team.get("team_name")))
+            print(f"Email: "+team.get("email"))
+            print(f"Owner: "+team.get("owner"))
+            print("="*50)
     except requests.exceptions.RequestException as e:
         print(f"Request error: {e}")
         return None
@@ -151,19 +254,14 @@ def upcoming_matches():
     suffix = "/upcoming_matches"
     endpoint = MONGO_BASE_URL + suffix
     params = {
-        "status": "Scheduled"
+        "status": "Scheduled",
+        "fields": "home_team_name,away_team_name,date"
     }
     try:
-        response = requests.get(endpoint, params=params)
-        if response.ok:
+        print("="*50)
+        for data in stream_documents(endpoint, params=params):
+            print(data.get("home_team_name"),data.get("away_team_name"),data.get("date"))
             print("="*50)
-            for data in response.json():
-                print(data.get("home_team_name"),data.get("away_team_name"),data.get("date"))
-                print("="*50)
-        else:
-            print(f"Error fetching matches: {response.status_code}")
-            return None
-            
     except requests.exceptions.RequestException as e:
         print(f"Request error: {e}")
         return None
@@ -174,19 +272,14 @@ def match_result():
     suffix = "/matches_score"
     endpoint = MONGO_BASE_URL + suffix
     params = {
-        "status": "Finished"
+        "status": "Finished",
+        "fields": "home_team_name,away_team_name,score"
     }
     try:
-        response = requests.get(endpoint, params=params)
-        if response.ok:
+        print("="*50)
+        for data in stream_documents(endpoint, params=params):
+            print(data.get("home_team_name"),data.get("away_team_name"),data.get("score"))
             print("="*50)
-            for data in response.json():
-                print(data.get("home_team_name"),data.get("away_team_name"),data.get("score"))
-                print("="*50)
-        else:
-            print(f"Error fetching matches: {response.status_code}")
-            return None
-            
     except requests.exceptions.RequestException as e:
         print(f"Request error: {e}")
         return None
@@ -195,10 +288,11 @@ def recent_matches(team):
     suffix ="/matches_team"
     endpoint = MONGO_BASE_URL + suffix
     params = {
-        "team_name": team
+        "team_name": team,
+        "fields": "home_team_name,away_team_name,date"
     }
     try:
-        response = requests.get(endpoint, params=params)
+        response = cached_get(endpoint, params=params)
         if response.ok:
             print("="*50)
             for data in response.json():
@@ -218,19 +312,64 @@ def past_matches(team):
     suffix ="/matches_team_all"
     endpoint = MONGO_BASE_URL + suffix
     params = {
-        "team_name": team
+        "team_name": team,
+        "fields": "home_team_name,away_team_name,date"
     }
     try:
-        response = requests.get(endpoint, params=params)
-        if response.ok:
+        print("="*50)
+        for data in stream_documents(endpoint, params=params):
+            print(f"Home Team: "+data.get("home_team_name")+" Away Team: "+data.get("away_team_name")+" Date: "+data.get("date"))
             print("="*50)
-            for data in response.json():
-                print(f"Home Team: "+data.get("home_team_name")+" Away Team: "+data.get("away_team_name")+" Date: "+data.get("date"))
-                print("="*50)        
-        else:
-            print(f"Error fetching matches: {response.status_code}")
+    except requests.exceptions.RequestException as e:
+        print(f"Request error: {e}")
+        return None
+
+def team_form(team, last=5):
+    # wins/draws/losses and goals are aggregated by the server
+    try:
+        response = cached_get(f"{MONGO_BASE_URL}/teams/{quote(team, safe='')}/form", params={"last": last})
+        if response.status_code == 404:
+            print(f"No played matches found for team {team}")
+            suggest_names(team, "team")
             return None
-            
+        response.raise_for_status()
+        form = response.json()
+        print("="*50)
+        print(f"Team: {form['team']} Form: {form['form']}")
+        print(f"W {form['wins']} D {form['draws']} L {form['losses']} Goals: {form['goals_for']}-{form['goals_against']} Points: {form['points']}")
+        for match in form["matches"]:
+            print(f"  {match['date']} {match['venue']} vs {match['opponent']}: {match['goals_for']}-{match['goals_against']} {match['result']}")
+        print("="*50)
+    except requests.exceptions.RequestException as e:
+        print(f"Request error: {e}")
+        return None
+
+def standings():
+    try:
+        response = cached_get(MONGO_BASE_URL + "/standings")
+        response.raise_for_status()
+        print("="*50)
+        print(f"{'#':>3} {'Team':30} {'P':>3} {'W':>3} {'D':>3} {'L':>3} {'GF':>4} {'GA':>4} {'GD':>4} {'Pts':>4}")
+        for row in response.json():
+            print(f"{row['position']:>3} {row['team']:30} {row['played']:>3} {row['wins']:>3} {row['draws']:>3} {row['losses']:>3} "
+                  f"{row['goals_for']:>4} {row['goals_against']:>4} {row['goal_difference']:>4} {row['points']:>4}")
+        print("="*50)
+    except requests.exceptions.RequestException as e:
+        print(f"Request error: {e}")
+        return None
+
+def head_to_head(team_a, team_b):
+    # one request instead of intersecting both teams' match lists here
+    try:
+        response = cached_get(MONGO_BASE_URL + "/matches/head_to_head", params={"team_a": team_a, "team_b": team_b})
+        response.raise_for_status()
+        result = response.json()
+        print("="*50)
+        print(f"{team_a} {result['team_a_wins']} - {result['draws']} - {result['team_b_wins']} {team_b} "
+              f"(played {result['played']}, goals {result['team_a_goals']}-{result['team_b_goals']})")
+        for match in result["matches"]:
+            print(f"  {match.get('date')} {match.get('home_team_name')} {match.get('score') or '-'} {match.get('away_team_name')}")
+        print("="*50)
     except requests.exceptions.RequestException as e:
         print(f"Request error: {e}")
         return None
@@ -242,7 +381,7 @@ def player_transfers(player):
         "player_name": player
     }
     try:
-        response = requests.get(endpoint, params=params)
+        response = cached_get(endpoint, params=params)
         if response.ok:
             response = response.json()
 
@@ -265,7 +404,7 @@ def awards(awarded):
         "awarded": awarded
     }
     try:
-        response = requests.get(endpoint, params=params)
+        response = cached_get(endpoint, params=params)
         if response.ok:
             response = response.json()
             print("="*50)
@@ -287,7 +426,7 @@ def player_value(player):
         "player_name": player
     }
     try:
-        response = requests.get(endpoint, params=params)
+        response = cached_get(endpoint, params=params)
         if response.ok:
             json_response = response.json()
             print("="*50)
@@ -296,6 +435,8 @@ def player_value(player):
             print("="*50)
         else:
             print(f"Error fetching matches: {response.status_code}")
+            if response.status_code == 404:
+                suggest_names(player, "player")
             return None
             
     except requests.exceptions.RequestException as e:
@@ -303,5 +444,30 @@ def player_value(player):
         return None
 
 
+def squad_report(players):
+    # One request per collection for the whole squad instead of one per player
+    params = {"player_name": list(players)}
+    try:
+        values = cached_get(MONGO_BASE_URL + "/player_values/batch", params=params)
+        transfers = cached_get(MONGO_BASE_URL + "/player_transfers/batch", params=params)
+        injuries = cached_get(MONGO_BASE_URL + "/player_injuries/batch", params=params)
+        for response in (values, transfers, injuries):
+            response.raise_for_status()
+        values, transfers, injuries = values.json(), transfers.json(), injuries.json()
+        print("="*50)
+        for player in players:
+            print(f"Player Name: {player}")
+            for item in values.get(player, []):
+                print(f"  Average Value: {item.get('avgValue')}, Max Value: {item.get('maxValue')}, Min Value: {item.get('minValue')}")
+            for item in transfers.get(player, []):
+                print(f"  Transfer: {item.get('from_team_name')} -> {item.get('team_name')} Date: {item.get('transfer_date')} Fee: {item.get('fee')}")
+            for item in injuries.get(player, []):
+                print(f"  Injury: {item.get('injury_type')} {item.get('start_date')} - {item.get('end_date')} Status: {item.get('status')}")
+            print("="*50)
+    except requests.exceptions.RequestException as e:
+        print(f"Request error: {e}")
+        return None
+
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
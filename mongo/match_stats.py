@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# Numeric score and statistics kept on the match documents.
+# score ("2-1 ") and statistics (["Possession: 55%", "Shots: 15", ...]) stay as they were sent;
+# home_goals, away_goals, their absolute goal_difference and the stats subdocument are parsed
+# from them on every write, so goal difference, clean sheet and shot count filters are indexed
+# queries inside Mongo.
+# team_pair is the folded, ordered pair of team names, the same for both venues of a fixture.
+# The team names themselves are stored without surrounding whitespace (matches.csv has
+# "Tigres UANL "), so form, standings and the team filters all match the same name.
+# Run as a module to backfill matches written before these fields existed:
+#   python -m mongo.match_stats [--all] [batch_size]
+import os
+import re
+import sys
+
+from pymongo import MongoClient, UpdateOne
+
+from .autocomplete import fold
+
+# label of a statistics entry, case folded -> (stats field, type)
+STAT_LABELS = {
+    "possession": ("possession", float),
+    "shots": ("shots", int),
+    "shots on target": ("shots_on_target", int),
+    "corners": ("corners", int),
+    "fouls": ("fouls", int),
+}
+_SCORE = re.compile(r"\s*(\d+)\s*-\s*(\d+)\s*")
+# a team name with leading or trailing whitespace
+_PADDED = r"^\s|\s$"
+
+
+def parse_score(score):
+    """(home_goals, away_goals) of a "2-1" score, (None, None) for anything else."""
+    match = _SCORE.fullmatch(score) if isinstance(score, str) else None
+    return (int(match.group(1)), int(match.group(2))) if match else (None, None)
+
+
+def parse_statistics(statistics) -> dict:
+    """Typed stats of "Label: value" entries; unknown labels and unparsable values are skipped."""
+    stats = {}
+    for entry in statistics or []:
+        label, _, value = str(entry).partition(":")
+        if label.strip().casefold() not in STAT_LABELS:
+            continue
+        field, kind = STAT_LABELS[label.strip().casefold()]
+        try:
+            stats[field] = kind(value.strip().rstrip("%").strip())
+        except ValueError:
+            continue
+    return stats
+
+
+def pair_key(team_a: str, team_b: str) -> str:
+    """Key of the fixture between two teams, in either order, ignoring case, accents and spacing."""
+    return "|".join(sorted((fold(team_a), fold(team_b))))
+
+
+def team_names(doc: dict) -> dict:
+    return {field: doc[field].strip() for field in ("home_team_name", "away_team_name") if isinstance(doc.get(field), str)}
+
+
+def match_stats(doc: dict) -> dict:
+    home_goals, away_goals = parse_score(doc.get("score"))
+    stats = parse_statistics(doc.get("statistics"))
+    team_pair = pair_key(doc["home_team_name"], doc["away_team_name"]) if doc.get("home_team_name") and doc.get("away_team_name") else None
+    goal_difference = abs(home_goals - away_goals) if home_goals is not None else None
+    return {"home_goals": home_goals, "away_goals": away_goals, "goal_difference": goal_difference, "stats": stats or None,
+            "team_pair": team_pair, **team_names(doc)}
+
+
+def with_match_stats(doc: dict) -> dict:
+    doc.update(match_stats(doc))
+    return doc
+
+
+def backfill(collection, batch_size: int = 500, recompute_all: bool = False) -> int:
+    """Parse the score and statistics and trim the team names of stored matches, batch_size per bulk_write; returns documents updated."""
+    query = {} if recompute_all else {"$or": [
+        {"home_goals": {"$exists": False}},
+        {"goal_difference": {"$exists": False}},
+        {"team_pair": {"$exists": False}},
+        {"home_team_name": {"$regex": _PADDED}},
+        {"away_team_name": {"$regex": _PADDED}},
+    ]}
+    updated = 0
+    last_id = None
+    while True:
+        page_query = {"$and": [query, {"_id": {"$gt": last_id}}]} if last_id is not None else query
+        docs = list(collection.find(page_query, {"score": 1, "statistics": 1, "home_team_name": 1, "away_team_name": 1}).sort("_id", 1).limit(batch_size))
+        if not docs:
+            return updated
+        updated += collection.bulk_write(
+            [UpdateOne({"_id": doc["_id"]}, {"$set": match_stats(doc)}) for doc in docs], ordered=False).modified_count
+        last_id = docs[-1]["_id"]
+        print(f"Backfilled {updated} match documents")
+
+
+def main():
+    args = [arg for arg in sys.argv[1:] if arg != "--all"]
+    batch_size = int(args[0]) if args else 500
+    client = MongoClient(os.getenv("MONGO_URI", "mongodb://localhost:27017"), uuidRepresentation="standard")
+    collection = client[os.getenv("MONGO_DB_NAME", "football_db")]["matches"]
+    try:
+        backfill(collection, batch_size, recompute_all="--all" in sys.argv)
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
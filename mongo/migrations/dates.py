@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+# One-shot migration of the date fields stored as ISO strings (by jsonable_encoder, before
+# to_document existed) to native BSON dates. Conversion runs server side, one update_many per
+# field, and only touches values that are still strings, so it is safe to run again.
+#   python -m mongo.migrations.dates
+import os
+
+from pymongo import MongoClient
+
+DATE_FIELDS = {
+    "matches": ["date"],
+    "player_injuries": ["start_date", "end_date"],
+    "player_transfers": ["transfer_date"],
+    "awards": ["date_awarded"],
+}
+
+
+def migrate(database) -> dict:
+    """Convert every string date field; returns {"collection.field": documents converted}."""
+    converted = {}
+    for collection, fields in DATE_FIELDS.items():
+        for field in fields:
+            result = database[collection].update_many(
+                {field: {"$type": "string"}},
+                # strings that do not parse are left as they are
+                [{"$set": {field: {"$dateFromString": {"dateString": f"${field}", "onError": f"${field}"}}}}],
+            )
+            converted[f"{collection}.{field}"] = result.modified_count
+            print(f"{collection}.{field}: {result.modified_count} documents converted")
+    return converted
+
+
+def main():
+    client = MongoClient(os.getenv("MONGO_URI", "mongodb://localhost:27017"))
+    try:
+        migrate(client[os.getenv("MONGO_DB_NAME", "football_db")])
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# One-shot migration of the uuid4 _id values stored as 36 character strings (by jsonable_encoder,
+# before to_document kept UUIDs native) to BSON Binary subtype 4, 16 bytes each.
+# _id cannot be updated in place, so every batch is inserted again under the binary id and the
+# string copies are deleted afterwards. A run interrupted between the two steps is finished by
+# running it again: ids already converted fail as duplicates and only the delete is repeated.
+# Index sizes of every collection are printed before and after; WiredTiger hands the freed pages
+# back to the filesystem only on compact, which --compact runs on each migrated collection.
+#   python -m mongo.migrations.uuids [--compact] [batch]
+import os
+import sys
+import uuid
+
+from pymongo import MongoClient
+from pymongo.errors import BulkWriteError
+
+UUID_COLLECTIONS = ["teams", "player_injuries", "awards", "matches"]
+DUPLICATE_KEY = 11000
+
+
+def index_sizes(database, collection: str) -> dict:
+    """Bytes used by each index of collection, plus "total"."""
+    stats = database.command("collStats", collection)
+    return {**stats.get("indexSizes", {}), "total": stats.get("totalIndexSize", 0)}
+
+
+def _as_uuid(value):
+    try:
+        return uuid.UUID(value)
+    except ValueError:
+        return None
+
+
+def migrate_collection(collection, batch_size: int = 500) -> int:
+    """Rewrite the string uuid _ids of collection as binary UUIDs; returns documents converted."""
+    converted = 0
+    skipped = set()  # string _ids that are not UUIDs stay as they are
+    while True:
+        query = {"_id": {"$type": "string", "$nin": list(skipped)}}
+        docs = list(collection.find(query).sort("_id", 1).limit(batch_size))
+        if not docs:
+            return converted
+        old_ids, new_docs = [], []
+        for doc in docs:
+            new_id = _as_uuid(doc["_id"])
+            if new_id is None:
+                skipped.add(doc["_id"])
+                continue
+            old_ids.append(doc["_id"])
+            new_docs.append({**doc, "_id": new_id})
+        if new_docs:
+            try:
+                collection.insert_many(new_docs, ordered=False)
+            except BulkWriteError as e:
+                errors = [error for error in e.details.get("writeErrors", []) if error.get("code") != DUPLICATE_KEY]
+                if errors:
+                    raise
+            collection.delete_many({"_id": {"$in": old_ids}})
+        converted += len(old_ids)
+        print(f"{collection.name}: {converted} ids converted")
+
+
+def migrate(database, batch_size: int = 500, compact: bool = False) -> dict:
+    """Migrate every collection with uuid ids; returns {collection: {"converted", "before", "after"}}."""
+    report = {}
+    for name in UUID_COLLECTIONS:
+        before = index_sizes(database, name)
+        converted = migrate_collection(database[name], batch_size)
+        if compact:
+            database.command("compact", name)
+        report[name] = {"converted": converted, "before": before, "after": index_sizes(database, name)}
+    return report
+
+
+def print_report(report: dict):
+    print(f"{'collection':18} {'index':34} {'before':>12} {'after':>12} {'saved':>12}")
+    for name, entry in report.items():
+        before, after = entry["before"], entry["after"]
+        for index in sorted(set(before) | set(after), key=lambda index: index == "total"):
+            saved = before.get(index, 0) - after.get(index, 0)
+            print(f"{name:18} {index:34} {before.get(index, 0):>12} {after.get(index, 0):>12} {saved:>12}")
+    saved = sum(entry["before"]["total"] - entry["after"]["total"] for entry in report.values())
+    print(f"Index bytes saved: {saved}")
+
+
+def main():
+    args = [arg for arg in sys.argv[1:] if arg != "--compact"]
+    batch_size = int(args[0]) if args else 500
+    client = MongoClient(os.getenv("MONGO_URI", "mongodb://localhost:27017"), uuidRepresentation="standard")
+    try:
+        report = migrate(client[os.getenv("MONGO_DB_NAME", "football_db")], batch_size, compact="--compact" in sys.argv)
+        print_report(report)
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,11 +2,39 @@
 import uuid
 from typing import List, Optional,Any
 from pydantic import BaseModel, Field
+from pydantic.datetime_parse import parse_date, parse_datetime
 from datetime import datetime
 
 
+def to_document(model: BaseModel) -> dict:
+    # datetimes and UUIDs stay native so Mongo stores BSON dates and 16 byte binary ids (the clients
+    # use uuidRepresentation="standard") instead of strings. Not jsonable_encoder(custom_encoder=...):
+    # it merges the custom encoders into the model's Config.json_encoders for good, so every later
+    # response of that model would carry native values that json.dumps cannot encode
+    return model.dict(by_alias=True)
+
+
+class QueryDate(datetime):
+    """Datetime query parameter that also takes a date alone ("2024-11-02" is its midnight)."""
+
+    @classmethod
+    def __get_validators__(cls):
+        yield cls.validate
+
+    @classmethod
+    def __modify_schema__(cls, field_schema):
+        field_schema.update(type="string", format="date-time")
+
+    @classmethod
+    def validate(cls, value):
+        try:
+            return parse_datetime(value)
+        except (TypeError, ValueError):
+            return datetime.combine(parse_date(value), datetime.min.time())
+
+
 class Team(BaseModel):
-    id: str = Field(default_factory=uuid.uuid4, alias='_id')
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, alias='_id')
     team_name: str = Field(...) #the (...) means that the field is required
     email: str = Field(...)
     password: str = Field(...)
@@ -23,7 +51,7 @@ class Team(BaseModel):
         }
 
 class PlayerInjuries(BaseModel):
-    injury_id: str = Field(default_factory=uuid.uuid4, alias='_id')
+    injury_id: uuid.UUID = Field(default_factory=uuid.uuid4, alias='_id')
     player_name: Optional[str] = Field(...)
     team_name: str = Field(...)
     injury_type: str = Field(...)
@@ -46,7 +74,7 @@ class PlayerInjuries(BaseModel):
         }
 
 class Awards(BaseModel):
-    award_id: str = Field(default_factory=uuid.uuid4, alias='_id')
+    award_id: uuid.UUID = Field(default_factory=uuid.uuid4, alias='_id')
     recipient_type: str = Field(...)
     recipient_name: str = Field(...)
     award_name: str = Field(...)
@@ -65,8 +93,15 @@ class Awards(BaseModel):
                 "date_awarded": "2022-01-01"
             }
         }
+class MatchStats(BaseModel):
+    possession: Optional[float]
+    shots: Optional[int]
+    shots_on_target: Optional[int]
+    corners: Optional[int]
+    fouls: Optional[int]
+
 class Matches(BaseModel):
-    match_id: str = Field(default_factory=uuid.uuid4, alias='_id')
+    match_id: uuid.UUID = Field(default_factory=uuid.uuid4, alias='_id')
     home_team_name: str = Field(...)
     away_team_name: str = Field(...)
     date: datetime = Field(...)
@@ -75,6 +110,12 @@ class Matches(BaseModel):
     score: Optional[Any]
     officials: List[str]
     statistics: Optional[List[str]]
+    # parsed from score and statistics on write, see mongo/match_stats.py
+    home_goals: Optional[int]
+    away_goals: Optional[int]
+    goal_difference: Optional[int]
+    stats: Optional[MatchStats]
+    team_pair: Optional[str]
     class Config:
         allow_population_by_field_name = True
         schema_extra = {
@@ -113,6 +154,7 @@ class PlayerValues(BaseModel):
     avgValue:Optional[float]
     maxValue:Optional[float]
     minValue:Optional[float]
+    valueCount:Optional[int]
     class Config:
         allow_population_by_field_name = True
         schema_extra = {
@@ -122,3 +164,68 @@ class PlayerValues(BaseModel):
             }
         }
 
+
+
+class BulkItemResult(BaseModel):
+    index: int
+    ok: bool
+    id: Optional[str]
+    error: Optional[str]
+
+class BulkInsertResult(BaseModel):
+    inserted: int
+    failed: int
+    results: List[BulkItemResult]
+
+class SearchHit(BaseModel):
+    collection: str
+    score: float
+    document: dict
+
+class NameSuggestion(BaseModel):
+    name: str
+    kind: str
+
+class FormMatch(BaseModel):
+    date: datetime
+    venue: str
+    opponent: str
+    goals_for: int
+    goals_against: int
+    result: str
+
+class TeamForm(BaseModel):
+    team: str
+    played: int
+    wins: int
+    draws: int
+    losses: int
+    goals_for: int
+    goals_against: int
+    goal_difference: int
+    points: int
+    form: str
+    matches: List[FormMatch]
+
+class StandingRow(BaseModel):
+    position: int
+    team: str
+    played: int
+    wins: int
+    draws: int
+    losses: int
+    goals_for: int
+    goals_against: int
+    goal_difference: int
+    points: int
+
+class HeadToHead(BaseModel):
+    team_a: str
+    team_b: str
+    played: int
+    team_a_wins: int
+    draws: int
+    team_b_wins: int
+    team_a_goals: int
+    team_b_goals: int
+    matches: List[Matches]
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# Keyset pagination for the list endpoints.
+# Every paged route sorts on an indexed key plus _id as tie breaker; the opaque
+# "after" cursor carries the sort values of the last document of the previous page,
+# so page N is a range scan on the index instead of a skip() over N-1 pages.
+import base64
+import binascii
+
+from bson import json_util
+from bson.binary import UuidRepresentation
+from fastapi import HTTPException, Response
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+MAX_PAGE_SIZE = 1000
+# cursors may carry a UUID _id; round trip it as a UUID so it compares equal to the stored Binary
+CURSOR_JSON_OPTIONS = json_util.JSONOptions(uuid_representation=UuidRepresentation.STANDARD)
+
+# Sort orders of the paged routes, each one matching an index of indexes.INDEX_SPEC
+TEAMS_ORDER = [("_id", 1)]
+MATCHES_ORDER = [("date", 1), ("_id", 1)]
+# the date indexes walked backwards
+MATCHES_DESC_ORDER = [("date", -1), ("_id", -1)]
+MATCHES_SORTS = {"date": MATCHES_ORDER, "-date": MATCHES_DESC_ORDER}
+AWARDS_ORDER = [("season", 1), ("_id", 1)]
+TRANSFERS_ORDER = [("transfer_date", -1), ("_id", -1)]
+
+
+def encode_cursor(doc, sort) -> str:
+    values = [doc.get(field) for field, _ in sort]
+    return base64.urlsafe_b64encode(json_util.dumps(values, json_options=CURSOR_JSON_OPTIONS).encode()).decode()
+
+
+def decode_cursor(token: str, sort) -> list:
+    try:
+        values = json_util.loads(base64.urlsafe_b64decode(token.encode()), json_options=CURSOR_JSON_OPTIONS)
+    except (binascii.Error, ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+    if not isinstance(values, list) or len(values) != len(sort):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+    return values
+
+
+def keyset_filter(query: dict, sort, values) -> dict:
+    # (a, b) > (va, vb)  <=>  a > va OR (a == va AND b > vb)
+    clauses = []
+    for i, (field, direction) in enumerate(sort):
+        clause = {prev_field: values[j] for j, (prev_field, _) in enumerate(sort[:i])}
+        clause[field] = {"$gt" if direction == 1 else "$lt": values[i]}
+        clauses.append(clause)
+    after = {"$or": clauses}
+    return {"$and": [query, after]} if query else after
+
+
+def keyset_find(collection, query: dict, sort, limit=None, after=None, projection=None, ordered=False):
+    """find() on collection, ordered by sort (when paging or ordered) and resumed after the cursor."""
+    if limit is None and after is None and not ordered:
+        return collection.find(query, projection)
+    if after is not None:
+        query = keyset_filter(query, sort, decode_cursor(after, sort))
+    return collection.find(query, projection).sort(sort)
+
+
+def paginate(cursor, sort, limit: int, response: Response) -> list:
+    """Materialize one page and advertise the cursor of the next one in X-Next-Cursor."""
+    page = list(cursor.limit(limit))
+    if len(page) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(page[-1], sort)
+    return page
+
+
+async def async_paginate(cursor, sort, limit: int, response: Response) -> list:
+    """Motor counterpart of paginate."""
+    page = await cursor.limit(limit).to_list(length=limit)
+    if len(page) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(page[-1], sort)
+    return page
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# ?fields= support for the GET routes.
+# The requested fields become a find() projection, and the response is encoded through a
+# trimmed model holding only those fields, so unread fields are neither sent nor validated.
+from functools import lru_cache
+from typing import Any, Optional
+
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, Field, create_model
+
+
+class PartialModel(BaseModel):
+    """Base of the models built for a ?fields= selection; values are passed through unvalidated."""
+    class Config:
+        allow_population_by_field_name = True
+
+
+def _mongo_keys(model) -> dict:
+    # field name and alias both map to the key stored in Mongo (the alias, e.g. match_id -> _id)
+    keys = {}
+    for name, field in model.__fields__.items():
+        key = field.alias or name
+        keys[name] = key
+        keys[key] = key
+    return keys
+
+
+@lru_cache(maxsize=256)
+def projected_model(model, keys: tuple):
+    definitions = {key.lstrip("_") or key: (Any, Field(None, alias=key)) for key in keys}
+    return create_model(f"{model.__name__}Fields", __base__=PartialModel, **definitions)
+
+
+def select_fields(model, fields: Optional[str], keep=()):
+    """Return (response model, find() projection) for a comma separated ?fields= value.
+
+    keep is the route's pagination sort order: its keys are fetched for the next-page cursor
+    but are not part of the response.
+    """
+    if not fields:
+        return model, None
+    known = _mongo_keys(model)
+    requested = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in requested if name not in known]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields for {model.__name__}: {', '.join(unknown)}")
+    keys = tuple(dict.fromkeys(known[name] for name in requested))
+    projection = {key: 1 for key in keys}
+    for key, _ in keep:
+        projection[key] = 1
+    if "_id" not in projection:
+        projection["_id"] = 0
+    return projected_model(model, keys), projection
+
+
+def is_partial(model) -> bool:
+    return isinstance(model, type) and issubclass(model, PartialModel)
+
+
+def respond(docs, model, headers=None):
+    """Encode docs (a document or a list) through a partial model; full models are left to the route's response_model."""
+    if not is_partial(model):
+        return docs
+    content = [model(**doc) for doc in docs] if isinstance(docs, list) else model(**docs)
+    return JSONResponse(content=jsonable_encoder(content), headers=headers)
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# Query shapes of the read routes, shared by both routers and by /debug/explain
+# so the plan being explained is the one the route actually runs.
+from datetime import datetime
+
+from fastapi import HTTPException
+
+from .match_stats import pair_key
+from .model import QueryDate
+from .pagination import TEAMS_ORDER, MATCHES_ORDER, AWARDS_ORDER, TRANSFERS_ORDER
+
+HEAD_TO_HEAD_ORDER = [("date", -1), ("_id", -1)]
+INJURIES_ORDER = [("start_date", 1)]
+
+
+def team_query(team_name: str) -> dict:
+    return {"team_name": team_name}
+
+
+def status_matches_query(match_status: str) -> dict:
+    return {"status": match_status}
+
+
+def scored_matches_query() -> dict:
+    return {"score": {"$ne": None}}
+
+
+def team_matches_query(team_name: str) -> dict:
+    # each branch is served by its own (home|away)_team_name, date, _id index
+    return {"$or": [{"home_team_name": team_name}, {"away_team_name": team_name}]}
+
+
+def head_to_head_query(team_a: str, team_b: str) -> dict:
+    return {"team_pair": pair_key(team_a, team_b)}
+
+
+def stats_matches_query(min_goal_difference=None, clean_sheet=None, min_shots=None) -> dict:
+    """Filter on the fields parsed at ingest; every given condition must hold."""
+    clauses = []
+    if min_goal_difference is not None:
+        # matches without a parsed score have a null goal_difference, and null never compares >= a number
+        clauses.append({"goal_difference": {"$gte": min_goal_difference}})
+    if clean_sheet is not None:
+        kept = {"$or": [{"home_goals": 0}, {"away_goals": 0}]}
+        clauses.append(kept if clean_sheet else {"home_goals": {"$gt": 0}, "away_goals": {"$gt": 0}})
+    if min_shots is not None:
+        clauses.append({"stats.shots": {"$gte": min_shots}})
+    if not clauses:
+        return {}
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+
+def player_query(player_name: str) -> dict:
+    return {"player_name": player_name}
+
+
+def players_query(player_names) -> dict:
+    return {"player_name": {"$in": list(player_names)}}
+
+
+def group_by_player(docs, player_names) -> dict:
+    """Key docs by player_name, with an empty list for every requested player without documents."""
+    grouped = {name: [] for name in player_names}
+    for doc in docs:
+        grouped.setdefault(doc["player_name"], []).append(doc)
+    return grouped
+
+
+def awards_query(recipient_name: str) -> dict:
+    return {"recipient_name": recipient_name}
+
+
+def active_injuries_query(team_name: str, moment) -> dict:
+    """Injuries of team_name with start_date <= moment <= end_date."""
+    return {"team_name": team_name, "start_date": {"$lte": moment}, "end_date": {"$gte": moment}}
+
+
+def with_date_range(query: dict, field: str, start=None, end=None) -> dict:
+    """Restrict query to start <= field < end; either bound may be None."""
+    bounds = {}
+    if start is not None:
+        bounds["$gte"] = start
+    if end is not None:
+        bounds["$lt"] = end
+    return {**query, field: bounds} if bounds else query
+
+
+def overlapping(query: dict, start_field: str, end_field: str, start=None, end=None) -> dict:
+    """Restrict query to documents whose [start_field, end_field] interval overlaps [start, end)."""
+    query = dict(query)
+    if end is not None:
+        query[start_field] = {"$lt": end}
+    if start is not None:
+        query[end_field] = {"$gte": start}
+    return query
+
+
+def _param(params: dict, name: str) -> str:
+    if name not in params:
+        raise HTTPException(status_code=400, detail=f"Query parameter '{name}' is required to explain this route")
+    return params[name]
+
+
+def _typed_param(params: dict, name: str, parse, default=None):
+    """params[name] through parse, default when absent; a value parse rejects is a 400, not a 500."""
+    if name not in params:
+        return default
+    try:
+        return parse(params[name])
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail=f"Query parameter '{name}' is invalid: {params[name]!r}")
+
+
+# route name -> params -> (collection, filter, sort)
+QUERY_SHAPES = {
+    "team": lambda params: ("teams", team_query(_param(params, "team")), None),
+    "teams": lambda params: ("teams", {}, TEAMS_ORDER),
+    "player_injuries": lambda params: ("player_injuries", player_query(_param(params, "player_name")), None),
+    "player_injuries_active": lambda params: ("player_injuries", active_injuries_query(
+        _param(params, "team_name"), _typed_param(params, "on", QueryDate.validate, datetime.utcnow())), INJURIES_ORDER),
+    "awards": lambda params: ("awards", awards_query(_param(params, "awarded")), AWARDS_ORDER),
+    "matches": lambda params: ("matches", status_matches_query("Finished"), MATCHES_ORDER),
+    "upcoming_matches": lambda params: ("matches", status_matches_query("Scheduled"), MATCHES_ORDER),
+    "matches_score": lambda params: ("matches", scored_matches_query(), MATCHES_ORDER),
+    "matches_stats": lambda params: ("matches", stats_matches_query(
+        _typed_param(params, "min_goal_difference", int),
+        _typed_param(params, "clean_sheet", lambda value: value.lower() in ("1", "true", "yes")),
+        _typed_param(params, "min_shots", int)), MATCHES_ORDER),
+    "head_to_head": lambda params: ("matches", head_to_head_query(_param(params, "team_a"), _param(params, "team_b")), HEAD_TO_HEAD_ORDER),
+    "matches_team": lambda params: ("matches", team_matches_query(_param(params, "team_name")), None),
+    "matches_team_all": lambda params: ("matches", team_matches_query(_param(params, "team_name")), MATCHES_ORDER),
+    "player_transfers": lambda params: ("player_transfers", player_query(_param(params, "player_name")), TRANSFERS_ORDER),
+    "player_values": lambda params: ("player_values", player_query(_param(params, "player_name")), None),
+}
+
+
+def explain_cursor(database, route: str, params: dict):
+    """Cursor of route's query shape, ready for .explain()."""
+    if route not in QUERY_SHAPES:
+        raise HTTPException(status_code=404, detail=f"No query shape for route {route}; known: {', '.join(QUERY_SHAPES)}")
+    collection, query, sort = QUERY_SHAPES[route](params)
+    cursor = database[collection].find(query)
+    return cursor.sort(sort) if sort else cursor
+
+
+def _stages(plan: dict):
+    yield plan
+    if "inputStage" in plan:
+        yield from _stages(plan["inputStage"])
+    for stage in plan.get("inputStages", []):
+        yield from _stages(stage)
+
+
+def summarize_explain(route: str, explain: dict) -> dict:
+    planner = explain.get("queryPlanner", {})
+    winning = planner.get("winningPlan", {})
+    # slot based engine (6.0+) nests the classic tree under queryPlan
+    winning = winning.get("queryPlan", winning)
+    stages = list(_stages(winning))
+    stats = explain.get("executionStats", {})
+    return {
+        "route": route,
+        "namespace": planner.get("namespace"),
+        "winning_plan": winning,
+        "stages": [stage.get("stage") for stage in stages],
+        "indexes": sorted({stage["indexName"] for stage in stages if "indexName" in stage}),
+        "collscan": any(stage.get("stage") == "COLLSCAN" for stage in stages),
+        "n_returned": stats.get("nReturned"),
+        "keys_examined": stats.get("totalKeysExamined"),
+        "docs_examined": stats.get("totalDocsExamined"),
+        "execution_time_ms": stats.get("executionTimeMillis"),
+    }
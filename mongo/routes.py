@@ -1,125 +1,343 @@
 #!/usr/bin/env python3
 from fastapi import APIRouter, Body, Request, Response, HTTPException, status,Query
-from fastapi.encoders import jsonable_encoder
-from typing import List, Optional,Union
+from typing import Dict, List, Optional,Union
 
-from .model import Team, PlayerInjuries, Awards, Matches,PlayerTransfers,PlayerValues
+from .model import Team, PlayerInjuries, Awards, Matches,PlayerTransfers,PlayerValues,BulkInsertResult,SearchHit,NameSuggestion,TeamForm,StandingRow,HeadToHead,QueryDate,to_document
+from .bulk import insert_batch, inserted_items
+from .streaming import list_or_stream
+from .cache import COLLECTIONS, cached, response_cache
+from .autocomplete import fold, name_index
+from .injuries import injury_intervals, default_day, naive_utc, today
+from .etag import conditional
+from .projection import select_fields, respond
+from .match_stats import with_match_stats
+from .standings import team_form, standings, head_to_head
+from .values import with_value_stats, append_value
+from .search import MAX_SEARCH_RESULTS, SKIPPED_HEADER, searchable_model, search, search_all
+from .queries import INJURIES_ORDER, active_injuries_query, team_query, status_matches_query, scored_matches_query, stats_matches_query, team_matches_query, player_query, players_query, with_date_range, overlapping, group_by_player, awards_query, explain_cursor, summarize_explain
+from .pagination import MAX_PAGE_SIZE, TEAMS_ORDER, MATCHES_ORDER, MATCHES_SORTS, AWARDS_ORDER, TRANSFERS_ORDER, keyset_find, paginate
 
 router = APIRouter()
 
+# Most player names accepted by the /.../batch routes
+MAX_BATCH_PLAYERS = 100
+
 @router.post("/team", response_description="Add new team", status_code=status.HTTP_201_CREATED,response_model=Team)
 def create_team(request:Request, team:Team=Body(...)):
-    team = jsonable_encoder(team)
+    team = to_document(team)
     print(team)
-    new_team = request.app.database["teams"].insert_one(team)
-    print(new_team)
-    created_team = request.app.database["teams"].find_one({"_id": new_team.inserted_id})
-    return created_team
+    # insert_one fills in _id on the document, so it is returned as is instead of read back
+    request.app.database["teams"].insert_one(team)
+    response_cache.invalidate("teams")
+    name_index.add_document("teams", team)
+    return team
 
 @router.get("/team",response_description="get Team",status_code = status.HTTP_200_OK,response_model=Team)
-def get_team(team:str,request: Request):
-    if(team := request.app.database["teams"].find_one({"team":team}))is not None:
-        return team
+@conditional("teams")
+def get_team(team:str,request: Request, response: Response, fields: Optional[str] = None):
+    model, projection = select_fields(Team, fields)
+    if(found := request.app.database["teams"].find_one(team_query(team), projection))is not None:
+        return respond(found, model)
     raise HTTPException(status_code=404,detail=f"Team {team} not found")
 
 @router.get("/teams", response_description="get Teams", status_code=status.HTTP_200_OK, response_model=List[Team])
-def get_teams(request: Request):
-    teams = list(request.app.database["teams"].find())
-    return teams
+@conditional("teams")
+@cached("teams", ttl=300)
+def get_teams(request: Request, response: Response, batch_size: Optional[int] = Query(None, gt=0),
+        limit: Optional[int] = Query(None, gt=0, le=MAX_PAGE_SIZE), after: Optional[str] = None, fields: Optional[str] = None):
+    model, projection = select_fields(Team, fields, TEAMS_ORDER)
+    docs = keyset_find(request.app.database["teams"], {}, TEAMS_ORDER, limit, after, projection)
+    if limit:
+        docs = paginate(docs, TEAMS_ORDER, limit, response)
+    return list_or_stream(request, docs, model, batch_size, response.headers)
 
 @router.post("/player_injuries", response_description="Add new player injury", status_code=status.HTTP_201_CREATED,response_model=PlayerInjuries)
 def create_player_injury(request:Request, player_injury:PlayerInjuries=Body(...)):
-    player_injury = jsonable_encoder(player_injury)
-    new_player_injury = request.app.database["player_injuries"].insert_one(player_injury)
-    created_player_injury = request.app.database["player_injuries"].find_one({"_id": new_player_injury.inserted_id})
-    return created_player_injury
+    player_injury = to_document(player_injury)
+    request.app.database["player_injuries"].insert_one(player_injury)
+    response_cache.invalidate("player_injuries")
+    injury_intervals.invalidate()
+    name_index.add_document("player_injuries", player_injury)
+    return player_injury
 
 
 @router.get("/player_injuries", response_description="get Player Injuries", status_code=status.HTTP_200_OK, response_model=PlayerInjuries)
-def get_player_injuries(request: Request, player_name: Optional[str] = Query(None)):
+@conditional("player_injuries")
+def get_player_injuries(request: Request, response: Response, player_name: Optional[str] = Query(None), fields: Optional[str] = None,
+        from_date: Optional[QueryDate] = Query(None, alias="from"), to_date: Optional[QueryDate] = Query(None, alias="to")):
     # Si el jugador es nulo, devolver todas las lesiones de jugadores
-    player_injury = request.app.database["player_injuries"].find_one({"player_name": player_name})
+    model, projection = select_fields(PlayerInjuries, fields)
+    player_injury = request.app.database["player_injuries"].find_one(overlapping(player_query(player_name), "start_date", "end_date", from_date, to_date), projection)
     print(player_injury)
     if player_injury:
-        return player_injury
+        return respond(player_injury, model)
     raise HTTPException(status_code=404, detail=f"Player {player_name} not found")
 @router.post("/awards", response_description="Add new award", status_code=status.HTTP_201_CREATED,response_model=Awards)
 def create_award(request:Request, award:Awards=Body(...)):
-    award = jsonable_encoder(award)
-    new_award = request.app.database["awards"].insert_one(award)
-    created_award = request.app.database["awards"].find_one({"_id": new_award.inserted_id})
-    return created_award
+    award = to_document(award)
+    request.app.database["awards"].insert_one(award)
+    response_cache.invalidate("awards")
+    name_index.add_document("awards", award)
+    return award
 
 @router.get("/awards", response_description="get Awards", status_code=status.HTTP_200_OK, response_model=List[Awards])
-def get_awards(request: Request, awarded:str):
-    return list(request.app.database["awards"].find({"recipient_name": awarded}))
+@conditional("awards")
+def get_awards(request: Request, response: Response, awarded:str,
+        limit: Optional[int] = Query(None, gt=0, le=MAX_PAGE_SIZE), after: Optional[str] = None, fields: Optional[str] = None):
+    model, projection = select_fields(Awards, fields, AWARDS_ORDER)
+    awards = keyset_find(request.app.database["awards"], awards_query(awarded), AWARDS_ORDER, limit, after, projection)
+    if limit:
+        return respond(paginate(awards, AWARDS_ORDER, limit, response), model, response.headers)
+    return respond(list(awards), model)
 
 @router.post("/matches", response_description="Add new match", status_code=status.HTTP_201_CREATED,response_model=Matches)
 def create_match(request:Request, match:Matches=Body(...)):
-    match = jsonable_encoder(match)
-    new_match = request.app.database["matches"].insert_one(match)
-    print(new_match)
-    created_match = request.app.database["matches"].find_one({"_id": new_match.inserted_id})
-    return created_match
+    match = with_match_stats(to_document(match))
+    request.app.database["matches"].insert_one(match)
+    response_cache.invalidate("matches")
+    name_index.add_document("matches", match)
+    return match
 
 @router.get("/matches", response_description="get Matches", status_code=status.HTTP_200_OK, response_model=List[Matches])
-def get_matches(request: Request):
+@conditional("matches")
+@cached("matches", ttl=30)
+def get_matches(request: Request, response: Response, batch_size: Optional[int] = Query(None, gt=0),
+        limit: Optional[int] = Query(None, gt=0, le=MAX_PAGE_SIZE), after: Optional[str] = None, fields: Optional[str] = None,
+        from_date: Optional[QueryDate] = Query(None, alias="from"), to_date: Optional[QueryDate] = Query(None, alias="to"),
+        before: Optional[QueryDate] = None, match_status: str = Query("Finished", alias="status"),
+        sort: Optional[str] = Query(None, regex="^-?date$")):
     # Verificar si los partidos están completados
-    return list(request.app.database["matches"].find({"status": "Finished"}))
+    # after is the pagination cursor; before is an exclusive upper date bound like to
+    order = MATCHES_SORTS[sort or "date"]
+    end = min((naive_utc(bound) for bound in (to_date, before) if bound is not None), default=None)
+    model, projection = select_fields(Matches, fields, order)
+    docs = keyset_find(request.app.database["matches"], with_date_range(status_matches_query(match_status), "date", from_date, end), order, limit, after, projection, ordered=sort is not None)
+    if limit:
+        docs = paginate(docs, order, limit, response)
+    return list_or_stream(request, docs, model, batch_size, response.headers)
 
 @router.get("/upcoming_matches", response_description="get Upcoming Matches", status_code=status.HTTP_200_OK, response_model=List[Matches])
-def get_upcoming_matches(request: Request):
+@conditional("matches")
+@cached("matches", ttl=30)
+def get_upcoming_matches(request: Request, response: Response, batch_size: Optional[int] = Query(None, gt=0),
+        limit: Optional[int] = Query(None, gt=0, le=MAX_PAGE_SIZE), after: Optional[str] = None, fields: Optional[str] = None,
+        from_date: Optional[QueryDate] = Query(None, alias="from"), to_date: Optional[QueryDate] = Query(None, alias="to")):
     # Verificar si los partidos están completados
-    return list(request.app.database["matches"].find({"status": "Scheduled"}))
+    model, projection = select_fields(Matches, fields, MATCHES_ORDER)
+    docs = keyset_find(request.app.database["matches"], with_date_range(status_matches_query("Scheduled"), "date", from_date, to_date), MATCHES_ORDER, limit, after, projection)
+    if limit:
+        docs = paginate(docs, MATCHES_ORDER, limit, response)
+    return list_or_stream(request, docs, model, batch_size, response.headers)
 
 @router.get("/matches_score", response_description="get Matches with score", status_code=status.HTTP_200_OK, response_model=List[Matches])
-def get_matches_score(request: Request):
+@conditional("matches")
+def get_matches_score(request: Request, response: Response, batch_size: Optional[int] = Query(None, gt=0),
+        limit: Optional[int] = Query(None, gt=0, le=MAX_PAGE_SIZE), after: Optional[str] = None, fields: Optional[str] = None,
+        from_date: Optional[QueryDate] = Query(None, alias="from"), to_date: Optional[QueryDate] = Query(None, alias="to")):
     # Verificar si los partidos están completados
-    return list(request.app.database["matches"].find({"score": {"$ne": None}}))
+    model, projection = select_fields(Matches, fields, MATCHES_ORDER)
+    docs = keyset_find(request.app.database["matches"], with_date_range(scored_matches_query(), "date", from_date, to_date), MATCHES_ORDER, limit, after, projection)
+    if limit:
+        docs = paginate(docs, MATCHES_ORDER, limit, response)
+    return list_or_stream(request, docs, model, batch_size, response.headers)
+
+@router.get("/matches/head_to_head", response_description="Matches and results between two teams", status_code=status.HTTP_200_OK, response_model=HeadToHead)
+@conditional("matches")
+@cached("matches", ttl=60)
+def get_head_to_head(request: Request, response: Response, team_a: str, team_b: str):
+    if fold(team_a) == fold(team_b):
+        raise HTTPException(status_code=400, detail="team_a and team_b must be different teams")
+    return head_to_head(request.app.database, team_a, team_b)
+
+@router.get("/matches_stats", response_description="get Matches by parsed score and statistics", status_code=status.HTTP_200_OK, response_model=List[Matches])
+@conditional("matches")
+def get_matches_stats(request: Request, response: Response, min_goal_difference: Optional[int] = Query(None, ge=0),
+        clean_sheet: Optional[bool] = None, min_shots: Optional[int] = Query(None, ge=0), batch_size: Optional[int] = Query(None, gt=0),
+        limit: Optional[int] = Query(None, gt=0, le=MAX_PAGE_SIZE), after: Optional[str] = None, fields: Optional[str] = None,
+        from_date: Optional[QueryDate] = Query(None, alias="from"), to_date: Optional[QueryDate] = Query(None, alias="to")):
+    model, projection = select_fields(Matches, fields, MATCHES_ORDER)
+    query = stats_matches_query(min_goal_difference, clean_sheet, min_shots)
+    docs = keyset_find(request.app.database["matches"], with_date_range(query, "date", from_date, to_date), MATCHES_ORDER, limit, after, projection)
+    if limit:
+        docs = paginate(docs, MATCHES_ORDER, limit, response)
+    return list_or_stream(request, docs, model, batch_size, response.headers)
 
 @router.get("/matches_team", response_description="get Matches by team", status_code=status.HTTP_200_OK, response_model=List[Matches]) #param is team_name
-def get_matches_team(request: Request, team_name:str):
+@conditional("matches")
+def get_matches_team(request: Request, response: Response, team_name:str, fields: Optional[str] = None,
+        from_date: Optional[QueryDate] = Query(None, alias="from"), to_date: Optional[QueryDate] = Query(None, alias="to")):
     # Verificar si los partidos están completados
     # solo primeros 5 partidos
-    return list(request.app.database["matches"].find({"$or":[{"home_team_name":team_name},{"away_team_name":team_name}]}).limit(5))
+    model, projection = select_fields(Matches, fields)
+    return respond(list(request.app.database["matches"].find(with_date_range(team_matches_query(team_name), "date", from_date, to_date), projection).limit(5)), model)
 
 @router.get("/matches_team_all", response_description="get Matches by team", status_code=status.HTTP_200_OK, response_model=List[Matches]) #param is team_name
-def get_matches_team(request: Request, team_name:str):
+@conditional("matches")
+def get_matches_team(request: Request, response: Response, team_name:str, batch_size: Optional[int] = Query(None, gt=0),
+        limit: Optional[int] = Query(None, gt=0, le=MAX_PAGE_SIZE), after: Optional[str] = None, fields: Optional[str] = None,
+        from_date: Optional[QueryDate] = Query(None, alias="from"), to_date: Optional[QueryDate] = Query(None, alias="to")):
     # Verificar si los partidos están completados
-    return list(request.app.database["matches"].find({"$or":[{"home_team_name":team_name},{"away_team_name":team_name}]}))
+    model, projection = select_fields(Matches, fields, MATCHES_ORDER)
+    docs = keyset_find(request.app.database["matches"], with_date_range(team_matches_query(team_name), "date", from_date, to_date), MATCHES_ORDER, limit, after, projection)
+    if limit:
+        docs = paginate(docs, MATCHES_ORDER, limit, response)
+    return list_or_stream(request, docs, model, batch_size, response.headers)
     
 
+@router.get("/teams/{name:path}/form", response_description="Results of a team's last matches", status_code=status.HTTP_200_OK, response_model=TeamForm)
+@conditional("matches")
+@cached("matches", ttl=60)
+def get_team_form(request: Request, response: Response, name: str, last: int = Query(5, gt=0, le=100)):
+    if (form := team_form(request.app.database, name, last)) is not None:
+        return form
+    raise HTTPException(status_code=404, detail=f"No played matches found for team {name}")
+
+@router.get("/standings", response_description="League table of the played matches", status_code=status.HTTP_200_OK, response_model=List[StandingRow])
+@conditional("matches")
+@cached("matches", ttl=60)
+def get_standings(request: Request, response: Response,
+        from_date: Optional[QueryDate] = Query(None, alias="from"), to_date: Optional[QueryDate] = Query(None, alias="to")):
+    return standings(request.app.database, from_date, to_date)
+
 @router.post("/player_transfers", response_description="Add new player transfer", status_code=status.HTTP_201_CREATED,response_model=PlayerTransfers)
 def create_player_transfer(request:Request, player_transfer:PlayerTransfers=Body(...)):
-    player_transfer = jsonable_encoder(player_transfer)
-    new_player_transfer = request.app.database["player_transfers"].insert_one(player_transfer)
-    created_player_transfer = request.app.database["player_transfers"].find_one({"_id": new_player_transfer.inserted_id})
-    if not created_player_transfer:
-        raise HTTPException(status_code=500, detail="Error fetching the created player transfer")
-    
-    return created_player_transfer
+    player_transfer = to_document(player_transfer)
+    request.app.database["player_transfers"].insert_one(player_transfer)
+    response_cache.invalidate("player_transfers")
+    name_index.add_document("player_transfers", player_transfer)
+    return player_transfer
 
 @router.get("/player_transfers", response_description="get Player Transfers", status_code=status.HTTP_200_OK, response_model=List[PlayerTransfers])
-def get_player_transfers(request: Request,player_name:str):
-    return list(request.app.database["player_transfers"].find({"player_name":player_name}))
+@conditional("player_transfers")
+def get_player_transfers(request: Request, response: Response, player_name:str,
+        limit: Optional[int] = Query(None, gt=0, le=MAX_PAGE_SIZE), after: Optional[str] = None, fields: Optional[str] = None,
+        from_date: Optional[QueryDate] = Query(None, alias="from"), to_date: Optional[QueryDate] = Query(None, alias="to")):
+    model, projection = select_fields(PlayerTransfers, fields, TRANSFERS_ORDER)
+    transfers = keyset_find(request.app.database["player_transfers"], with_date_range(player_query(player_name), "transfer_date", from_date, to_date), TRANSFERS_ORDER, limit, after, projection)
+    if limit:
+        return respond(paginate(transfers, TRANSFERS_ORDER, limit, response), model, response.headers)
+    return respond(list(transfers), model)
 
 @router.post("/player_values", response_description="Add new player value", status_code=status.HTTP_201_CREATED,response_model=PlayerValues)
 def create_player_value(request:Request, player_value:PlayerValues=Body(...)):
-    player_value = jsonable_encoder(player_value)
-    new_player_value = request.app.database["player_values"].insert_one(player_value)
-    created_player_value = request.app.database["player_values"].find_one({"_id": new_player_value.inserted_id})
-    return created_player_value
+    player_value = with_value_stats(to_document(player_value))
+    request.app.database["player_values"].insert_one(player_value)
+    response_cache.invalidate("player_values")
+    name_index.add_document("player_values", player_value)
+    return player_value
 
 @router.get("/player_values", response_description="get Player Values", status_code=status.HTTP_200_OK, response_model=List[PlayerValues])
-def get_player_values(request: Request, player_name:str):
-    try:
-        results = aggregations(player_name,request)
-        print(results)
-        if results:
-            return results
-        raise HTTPException(status_code=404, detail=f"Player {player_name} not found")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+@conditional("player_values")
+@cached("player_values", ttl=60)
+def get_player_values(request: Request, response: Response, player_name:str):
+    # statistics are maintained on write (see mongo/values.py), so this is a plain player_name lookup
+    results = list(request.app.database["player_values"].find(player_query(player_name)))
+    if results:
+        return results
+    raise HTTPException(status_code=404, detail=f"Player {player_name} not found")
+
+@router.post("/player_values/{player_name}/values", response_description="Append a value to a player's history", status_code=status.HTTP_200_OK,response_model=PlayerValues)
+def append_player_value(request:Request, player_name:str, value:int=Body(..., embed=True)):
+    player_value = append_value(request.app.database["player_values"], player_name, value)
+    response_cache.invalidate("player_values")
+    name_index.add(player_name, "player")
+    return player_value
+
+@router.get("/player_injuries/active", response_description="get Player Injuries of a team active on a date or overlapping a period", status_code=status.HTTP_200_OK, response_model=List[PlayerInjuries])
+@conditional("player_injuries", vary=default_day)
+def get_active_injuries(request: Request, response: Response, team_name: str, on: Optional[QueryDate] = None,
+        from_date: Optional[QueryDate] = Query(None, alias="from"), to_date: Optional[QueryDate] = Query(None, alias="to")):
+    # from/to select the injuries overlapping the period, otherwise those active on the date (default today)
+    if from_date is not None or to_date is not None:
+        query = overlapping(team_query(team_name), "start_date", "end_date", from_date, to_date)
+    else:
+        query = active_injuries_query(team_name, on or today())
+    return list(request.app.database["player_injuries"].find(query).sort(INJURIES_ORDER))
+
+@router.get("/player_injuries/availability", response_description="Injuries active on a date, by team", status_code=status.HTTP_200_OK, response_model=Dict[str, List[PlayerInjuries]])
+@conditional("player_injuries", vary=default_day)
+def get_injury_availability(request: Request, response: Response, on: Optional[QueryDate] = None):
+    # answered by the in-memory interval tree (mongo/injuries.py), every team at once
+    return injury_intervals.active_by_team(request.app.database, on or today())
+
+@router.get("/player_injuries/batch", response_description="get Player Injuries of several players", status_code=status.HTTP_200_OK, response_model=Dict[str, List[PlayerInjuries]])
+@conditional("player_injuries")
+def get_player_injuries_batch(request: Request, response: Response, player_name: List[str] = Query(..., max_items=MAX_BATCH_PLAYERS)):
+    injuries = list(request.app.database["player_injuries"].find(players_query(player_name)))
+    return group_by_player(injuries, player_name)
+
+@router.get("/player_transfers/batch", response_description="get Player Transfers of several players", status_code=status.HTTP_200_OK, response_model=Dict[str, List[PlayerTransfers]])
+@conditional("player_transfers")
+def get_player_transfers_batch(request: Request, response: Response, player_name: List[str] = Query(..., max_items=MAX_BATCH_PLAYERS)):
+    transfers = list(request.app.database["player_transfers"].find(players_query(player_name)).sort(TRANSFERS_ORDER))
+    return group_by_player(transfers, player_name)
+
+@router.get("/player_values/batch", response_description="get Player Values of several players", status_code=status.HTTP_200_OK, response_model=Dict[str, List[PlayerValues]])
+@conditional("player_values")
+def get_player_values_batch(request: Request, response: Response, player_name: List[str] = Query(..., max_items=MAX_BATCH_PLAYERS)):
+    values = list(request.app.database["player_values"].find(players_query(player_name)))
+    return group_by_player(values, player_name)
+
+@router.get("/autocomplete", response_description="Player and team names starting with a prefix", status_code=status.HTTP_200_OK, response_model=List[NameSuggestion])
+def autocomplete(q: str, limit: int = Query(10, gt=0, le=100), kind: Optional[str] = Query(None, regex="^(player|team)$")):
+    # answered from memory, Mongo is not queried
+    return name_index.complete(q, limit, kind)
+
+@router.get("/search", response_description="Text search across every collection", status_code=status.HTTP_200_OK, response_model=List[SearchHit])
+def search_everything(request: Request, response: Response, q: str, limit: int = Query(20, gt=0, le=MAX_SEARCH_RESULTS)):
+    hits, skipped = search_all(request.app.database, q, limit)
+    if skipped:
+        response.headers[SKIPPED_HEADER] = ",".join(skipped)
+    return hits
+
+@router.get("/search/{collection}", response_description="Text search in one collection", status_code=status.HTTP_200_OK, response_model=List[SearchHit])
+def search_collection(request: Request, collection: str, q: str, limit: int = Query(20, gt=0, le=MAX_SEARCH_RESULTS),
+        offset: int = Query(0, ge=0), fields: Optional[str] = None):
+    model, projection = select_fields(searchable_model(collection), fields)
+    return search(request.app.database, collection, q, model, projection, limit, offset)
+
+@router.post("/team/bulk", response_description="Add teams in one batch", status_code=status.HTTP_201_CREATED,response_model=BulkInsertResult)
+def create_teams_bulk(request:Request, items:List[dict]=Body(...)):
+    result = insert_batch(request.app.database["teams"], items, Team)
+    response_cache.invalidate("teams")
+    name_index.add_documents("teams", inserted_items(items, result))
+    return result
+
+@router.post("/player_injuries/bulk", response_description="Add player injuries in one batch", status_code=status.HTTP_201_CREATED,response_model=BulkInsertResult)
+def create_player_injuries_bulk(request:Request, items:List[dict]=Body(...)):
+    result = insert_batch(request.app.database["player_injuries"], items, PlayerInjuries)
+    response_cache.invalidate("player_injuries")
+    injury_intervals.invalidate()
+    name_index.add_documents("player_injuries", inserted_items(items, result))
+    return result
+
+@router.post("/awards/bulk", response_description="Add awards in one batch", status_code=status.HTTP_201_CREATED,response_model=BulkInsertResult)
+def create_awards_bulk(request:Request, items:List[dict]=Body(...)):
+    result = insert_batch(request.app.database["awards"], items, Awards)
+    response_cache.invalidate("awards")
+    name_index.add_documents("awards", inserted_items(items, result))
+    return result
+
+@router.post("/matches/bulk", response_description="Add matches in one batch", status_code=status.HTTP_201_CREATED,response_model=BulkInsertResult)
+def create_matches_bulk(request:Request, items:List[dict]=Body(...)):
+    result = insert_batch(request.app.database["matches"], items, Matches, with_match_stats)
+    response_cache.invalidate("matches")
+    name_index.add_documents("matches", inserted_items(items, result))
+    return result
+
+@router.post("/player_transfers/bulk", response_description="Add player transfers in one batch", status_code=status.HTTP_201_CREATED,response_model=BulkInsertResult)
+def create_player_transfers_bulk(request:Request, items:List[dict]=Body(...)):
+    result = insert_batch(request.app.database["player_transfers"], items, PlayerTransfers)
+    response_cache.invalidate("player_transfers")
+    name_index.add_documents("player_transfers", inserted_items(items, result))
+    return result
+
+@router.post("/player_values/bulk", response_description="Add player values in one batch", status_code=status.HTTP_201_CREATED,response_model=BulkInsertResult)
+def create_player_values_bulk(request:Request, items:List[dict]=Body(...)):
+    result = insert_batch(request.app.database["player_values"], items, PlayerValues, with_value_stats)
+    response_cache.invalidate("player_values")
+    name_index.add_documents("player_values", inserted_items(items, result))
+    return result
 
 @router.delete("/all", response_description="Delete all data", status_code=status.HTTP_200_OK)
 def delete_all(request:Request):
@@ -129,30 +347,35 @@ def delete_all(request:Request):
     request.app.database["matches"].delete_many({})
     request.app.database["player_transfers"].delete_many({})
     request.app.database["player_values"].delete_many({})
+    response_cache.invalidate(*COLLECTIONS)
+    name_index.clear()
+    injury_intervals.invalidate()
     print("All data deleted")
     return Response(status_code=status.HTTP_200_OK)
 
+@router.get("/admin/indexes", response_description="Index reconciliation progress", status_code=status.HTTP_200_OK)
+def get_index_progress(request:Request):
+    return request.app.index_reconciler.progress()
+
+@router.get("/debug/explain/{route}", response_description="Winning plan of a route's query", status_code=status.HTTP_200_OK)
+def explain_route(route:str, request:Request):
+    # route parameters (team_name, player_name, awarded, team) are passed as query parameters
+    cursor = explain_cursor(request.app.database, route, dict(request.query_params))
+    return summarize_explain(route, cursor.explain())
+
+@router.post("/cache/invalidate", response_description="Drop what the API keeps in memory about collections written outside it", status_code=status.HTTP_200_OK)
+def invalidate_cache(request: Request, collection: List[str] = Query(...)):
+    # for writers that go straight to Mongo (mongo/data/sync.py): cached responses and ETags,
+    # the autocomplete names and the injury interval tree are rebuilt from the database
+    unknown = sorted(set(collection) - set(COLLECTIONS))
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown collections {', '.join(unknown)}; known: {', '.join(COLLECTIONS)}")
+    response_cache.invalidate(*collection)
+    if "player_injuries" in collection:
+        injury_intervals.invalidate()
+    name_index.reload(request.app.database)
+    return {"invalidated": collection}
 
-def aggregations(player_name:str,request:Request):
-    pipeline = [
-        {"$match": {"player_name": player_name}},
-        {"$project": {
-            "player_name": 1,
-            "value_history": 1,
-            "values": {
-                "$map": {
-                    "input": "$value_history",
-                    "as": "value",
-                    "in": {"$toDouble": "$$value"}  # Convert string values to numbers
-                }
-            }
-        }},
-        {"$project": {
-            "player_name": 1,
-            "value_history": 1,
-            "avgValue": {"$avg": "$values"},
-            "maxValue": {"$max": "$values"},
-            "minValue": {"$min": "$values"}
-        }}
-    ]
-    return list(request.app.database["player_values"].aggregate(pipeline))  
+@router.get("/cache/stats", response_description="Response cache counters", status_code=status.HTTP_200_OK)
+def get_cache_stats():
+    return response_cache.stats()
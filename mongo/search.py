@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# $text search over the TEXT indexes declared in mongo/indexes.py.
+# Results are sorted by textScore inside Mongo and only the requested page is returned.
+# textScore is computed per query, so pages are taken with skip() over the scored matches
+# rather than with the keyset cursors of the list routes.
+# A collection whose TEXT index does not exist yet (e.g. still being built by the index
+# reconciler) is left out of /search and named in its X-Search-Skipped header.
+import asyncio
+import heapq
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from pymongo.errors import OperationFailure
+
+from .model import Team, PlayerInjuries, Awards, Matches, PlayerTransfers, PlayerValues
+
+# collection -> model of its documents; every one has a TEXT index
+SEARCHABLE = {
+    "teams": Team,
+    "matches": Matches,
+    "player_injuries": PlayerInjuries,
+    "player_transfers": PlayerTransfers,
+    "awards": Awards,
+    "player_values": PlayerValues,
+}
+# "score" is already a Matches field
+SCORE_FIELD = "search_score"
+MAX_SEARCH_RESULTS = 200
+SKIPPED_HEADER = "X-Search-Skipped"
+# error code of a $text query on a collection without a TEXT index
+INDEX_NOT_FOUND = 27
+
+
+def searchable_model(collection: str):
+    if collection not in SEARCHABLE:
+        raise HTTPException(status_code=404, detail=f"Collection {collection} is not searchable; known: {', '.join(SEARCHABLE)}")
+    return SEARCHABLE[collection]
+
+
+def search_cursor(database, collection: str, q: str, projection=None, limit: int = 20, offset: int = 0):
+    projection = dict(projection or {})
+    projection[SCORE_FIELD] = {"$meta": "textScore"}
+    return (database[collection]
+            .find({"$text": {"$search": q}}, projection)
+            .sort([(SCORE_FIELD, {"$meta": "textScore"})])
+            .skip(offset)
+            .limit(limit))
+
+
+def to_hits(collection: str, docs, model) -> list:
+    return [
+        {"collection": collection, "score": doc.pop(SCORE_FIELD), "document": jsonable_encoder(model(**doc))}
+        for doc in docs
+    ]
+
+
+def merge_hits(hit_lists, limit: int) -> list:
+    """Merge per-collection hit lists (each sorted by score) into the best limit hits overall."""
+    merged = heapq.merge(*hit_lists, key=lambda hit: hit["score"], reverse=True)
+    return [hit for _, hit in zip(range(limit), merged)]
+
+
+def search(database, collection: str, q: str, model, projection=None, limit: int = 20, offset: int = 0) -> list:
+    return to_hits(collection, list(search_cursor(database, collection, q, projection, limit, offset)), model)
+
+
+async def async_search(database, collection: str, q: str, model, projection=None, limit: int = 20, offset: int = 0) -> list:
+    """Motor counterpart of search."""
+    docs = await search_cursor(database, collection, q, projection, limit, offset).to_list(length=limit)
+    return to_hits(collection, docs, model)
+
+
+def _skip_unindexed(collection: str, skipped: list, error: OperationFailure) -> list:
+    if error.code != INDEX_NOT_FOUND:
+        raise error
+    skipped.append(collection)
+    return []
+
+
+def search_all(database, q: str, limit: int = 20):
+    """Run the search on every searchable collection at once; returns the best limit hits and the collections skipped."""
+    skipped = []
+
+    def search_one(collection):
+        try:
+            return search(database, collection, q, SEARCHABLE[collection], limit=limit)
+        except OperationFailure as e:
+            return _skip_unindexed(collection, skipped, e)
+
+    with ThreadPoolExecutor(max_workers=len(SEARCHABLE)) as pool:
+        hit_lists = list(pool.map(search_one, SEARCHABLE))
+    return merge_hits(hit_lists, limit), sorted(skipped)
+
+
+async def async_search_all(database, q: str, limit: int = 20):
+    """Motor counterpart of search_all."""
+    skipped = []
+
+    async def search_one(collection, model):
+        try:
+            return await async_search(database, collection, q, model, limit=limit)
+        except OperationFailure as e:
+            return _skip_unindexed(collection, skipped, e)
+
+    hit_lists = await asyncio.gather(*(search_one(collection, model) for collection, model in SEARCHABLE.items()))
+    return merge_hits(hit_lists, limit), sorted(skipped)
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# Team form, league table and head to head, computed from the goals parsed at ingest
+# (mongo/match_stats.py), which also trims the team names, so form and standings see the same
+# names. Only matches with a parsed score count; the routes are cached on "matches", so every
+# match write recomputes them on the next request.
+from .autocomplete import fold
+from .queries import HEAD_TO_HEAD_ORDER, head_to_head_query, team_matches_query, with_date_range
+
+# a match counts once both scores were parsed from it
+PLAYED_QUERY = {"home_goals": {"$type": "number"}, "away_goals": {"$type": "number"}}
+WIN_POINTS = 3
+DRAW_POINTS = 1
+
+
+def _count(condition) -> dict:
+    return {"$sum": {"$cond": [condition, 1, 0]}}
+
+
+# $group accumulators over rows carrying goals_for and goals_against of one team
+_TOTALS = {
+    "played": {"$sum": 1},
+    "wins": _count({"$gt": ["$goals_for", "$goals_against"]}),
+    "draws": _count({"$eq": ["$goals_for", "$goals_against"]}),
+    "losses": _count({"$lt": ["$goals_for", "$goals_against"]}),
+    "goals_for": {"$sum": "$goals_for"},
+    "goals_against": {"$sum": "$goals_against"},
+}
+_DERIVED = {
+    "goal_difference": {"$subtract": ["$goals_for", "$goals_against"]},
+    "points": {"$add": [{"$multiply": ["$wins", WIN_POINTS]}, {"$multiply": ["$draws", DRAW_POINTS]}]},
+}
+
+
+def form_pipeline(team_name: str, last: int) -> list:
+    home = {"$eq": ["$home_team_name", team_name]}
+    return [
+        # each $or branch walks its (home|away)_team_name, date, _id index backwards
+        {"$match": {**team_matches_query(team_name), **PLAYED_QUERY}},
+        {"$sort": {"date": -1, "_id": -1}},
+        {"$limit": last},
+        {"$project": {
+            "_id": 0,
+            "date": 1,
+            "venue": {"$cond": [home, "home", "away"]},
+            "opponent": {"$cond": [home, "$away_team_name", "$home_team_name"]},
+            "goals_for": {"$cond": [home, "$home_goals", "$away_goals"]},
+            "goals_against": {"$cond": [home, "$away_goals", "$home_goals"]},
+        }},
+        {"$set": {"result": {"$switch": {
+            "branches": [
+                {"case": {"$gt": ["$goals_for", "$goals_against"]}, "then": "W"},
+                {"case": {"$lt": ["$goals_for", "$goals_against"]}, "then": "L"},
+            ],
+            "default": "D",
+        }}}},
+        {"$facet": {
+            "matches": [{"$project": {"date": 1, "venue": 1, "opponent": 1, "goals_for": 1, "goals_against": 1, "result": 1}}],
+            "totals": [{"$group": {"_id": None, **_TOTALS}}, {"$set": _DERIVED}, {"$project": {"_id": 0}}],
+        }},
+    ]
+
+
+def to_form(team_name: str, facets: list):
+    """Form of team_name from the $facet output, or None when it has no played match."""
+    if not facets or not facets[0]["totals"]:
+        return None
+    matches = facets[0]["matches"]
+    return {"team": team_name, **facets[0]["totals"][0], "form": "".join(match["result"] for match in matches), "matches": matches}
+
+
+def standings_pipeline(start=None, end=None) -> list:
+    return [
+        {"$match": with_date_range(PLAYED_QUERY, "date", start, end)},
+        # one row per team and match
+        {"$project": {"_id": 0, "sides": [
+            {"team": "$home_team_name", "goals_for": "$home_goals", "goals_against": "$away_goals"},
+            {"team": "$away_team_name", "goals_for": "$away_goals", "goals_against": "$home_goals"},
+        ]}},
+        {"$unwind": "$sides"},
+        {"$replaceWith": "$sides"},
+        {"$group": {"_id": "$team", **_TOTALS}},
+        {"$set": _DERIVED},
+        {"$sort": {"points": -1, "goal_difference": -1, "goals_for": -1, "_id": 1}},
+        {"$project": {"_id": 0, "team": "$_id", **{field: 1 for field in (*_TOTALS, *_DERIVED)}}},
+    ]
+
+
+def to_standings(rows: list) -> list:
+    return [{"position": position, **row} for position, row in enumerate(rows, start=1)]
+
+
+def team_form(database, team_name: str, last: int):
+    team_name = team_name.strip()
+    return to_form(team_name, list(database["matches"].aggregate(form_pipeline(team_name, last))))
+
+
+async def async_team_form(database, team_name: str, last: int):
+    """Motor counterpart of team_form."""
+    team_name = team_name.strip()
+    facets = await database["matches"].aggregate(form_pipeline(team_name, last)).to_list(length=None)
+    return to_form(team_name, facets)
+
+
+def standings(database, start=None, end=None) -> list:
+    return to_standings(list(database["matches"].aggregate(standings_pipeline(start, end))))
+
+
+async def async_standings(database, start=None, end=None) -> list:
+    """Motor counterpart of standings."""
+    return to_standings(await database["matches"].aggregate(standings_pipeline(start, end)).to_list(length=None))
+
+
+def to_head_to_head(team_a: str, team_b: str, matches: list) -> dict:
+    """Totals from team_a's side over the fixtures between the two teams (newest first)."""
+    summary = {"team_a": team_a, "team_b": team_b, "played": 0, "team_a_wins": 0, "draws": 0, "team_b_wins": 0,
+               "team_a_goals": 0, "team_b_goals": 0, "matches": matches}
+    for match in matches:
+        if not isinstance(match.get("home_goals"), int) or not isinstance(match.get("away_goals"), int):
+            continue
+        if fold(match["home_team_name"]) == fold(team_a):
+            goals_a, goals_b = match["home_goals"], match["away_goals"]
+        else:
+            goals_a, goals_b = match["away_goals"], match["home_goals"]
+        summary["played"] += 1
+        summary["team_a_goals"] += goals_a
+        summary["team_b_goals"] += goals_b
+        summary["team_a_wins" if goals_a > goals_b else "team_b_wins" if goals_b > goals_a else "draws"] += 1
+    return summary
+
+
+def head_to_head(database, team_a: str, team_b: str) -> dict:
+    matches = list(database["matches"].find(head_to_head_query(team_a, team_b)).sort(HEAD_TO_HEAD_ORDER))
+    return to_head_to_head(team_a, team_b, matches)
+
+
+async def async_head_to_head(database, team_a: str, team_b: str) -> dict:
+    """Motor counterpart of head_to_head."""
+    matches = await database["matches"].find(head_to_head_query(team_a, team_b)).sort(HEAD_TO_HEAD_ORDER).to_list(length=None)
+    return to_head_to_head(team_a, team_b, matches)
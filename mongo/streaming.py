@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+# NDJSON streaming for the full-collection endpoints.
+# A client sending "Accept: application/x-ndjson" gets one JSON document per line,
+# written as the cursor yields them instead of after the whole list is built.
+import json
+import os
+
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+
+from .projection import respond
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+# Documents fetched per getMore; override per request with ?batch_size=
+STREAM_BATCH_SIZE = int(os.getenv("MONGO_STREAM_BATCH_SIZE", "500"))
+
+
+def wants_ndjson(request: Request) -> bool:
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+def _encode(doc, model) -> str:
+    # Same shape as the JSON endpoints: validate through the response model, keep aliases
+    return json.dumps(jsonable_encoder(model(**doc)), ensure_ascii=False) + "\n"
+
+
+def ndjson_lines(cursor, model):
+    for doc in cursor:
+        yield _encode(doc, model)
+
+
+async def async_ndjson_lines(cursor, model):
+    async for doc in cursor:
+        yield _encode(doc, model)
+
+
+def list_or_stream(request: Request, docs, model, batch_size=None, headers=None):
+    """Return docs (a cursor or an already fetched page) as an NDJSON stream if the client asked for it, otherwise as a list."""
+    if wants_ndjson(request):
+        if not isinstance(docs, list):
+            docs = docs.batch_size(batch_size or STREAM_BATCH_SIZE)
+        return StreamingResponse(ndjson_lines(docs, model), media_type=NDJSON_MEDIA_TYPE, headers=headers)
+    return respond(list(docs), model, headers)
+
+
+async def async_list_or_stream(request: Request, docs, model, batch_size=None, headers=None):
+    """Motor counterpart of list_or_stream."""
+    if isinstance(docs, list):
+        return list_or_stream(request, docs, model, headers=headers)
+    if wants_ndjson(request):
+        docs = docs.batch_size(batch_size or STREAM_BATCH_SIZE)
+        return StreamingResponse(async_ndjson_lines(docs, model), media_type=NDJSON_MEDIA_TYPE, headers=headers)
+    return respond(await docs.to_list(length=None), model, headers)
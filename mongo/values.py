@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# Player value statistics kept on the player_values documents.
+# avgValue, maxValue, minValue and valueCount are written together with value_history,
+# so reading them is a plain indexed lookup instead of an aggregation per request.
+# Run as a module to backfill documents written before the statistics existed:
+#   python -m mongo.values [--all] [batch_size]
+import os
+import sys
+
+from pymongo import MongoClient, ReturnDocument
+
+STATS_FIELDS = ("avgValue", "maxValue", "minValue", "valueCount")
+
+# value_history may hold numbers or numeric strings, as the old aggregation allowed
+_HISTORY = {"$ifNull": ["$value_history", []]}
+_NUMBERS = {"$map": {"input": _HISTORY, "as": "value", "in": {"$toDouble": "$$value"}}}
+STATS_STAGE = {"$set": {
+    "avgValue": {"$avg": _NUMBERS},
+    "maxValue": {"$max": _NUMBERS},
+    "minValue": {"$min": _NUMBERS},
+    "valueCount": {"$size": _HISTORY},
+}}
+
+
+def value_stats(value_history) -> dict:
+    values = [float(value) for value in value_history or []]
+    if not values:
+        return {"avgValue": None, "maxValue": None, "minValue": None, "valueCount": 0}
+    return {
+        "avgValue": sum(values) / len(values),
+        "maxValue": max(values),
+        "minValue": min(values),
+        "valueCount": len(values),
+    }
+
+
+def with_value_stats(doc: dict) -> dict:
+    doc.update(value_stats(doc.get("value_history")))
+    return doc
+
+
+def append_value_update(value) -> list:
+    """Update pipeline appending value to value_history and recomputing the statistics in the same write."""
+    return [
+        {"$set": {"value_history": {"$concatArrays": [_HISTORY, [value]]}}},
+        STATS_STAGE,
+    ]
+
+
+def append_value(collection, player_name: str, value):
+    return collection.find_one_and_update(
+        {"player_name": player_name}, append_value_update(value),
+        upsert=True, return_document=ReturnDocument.AFTER)
+
+
+async def async_append_value(collection, player_name: str, value):
+    """Motor counterpart of append_value."""
+    return await collection.find_one_and_update(
+        {"player_name": player_name}, append_value_update(value),
+        upsert=True, return_document=ReturnDocument.AFTER)
+
+
+def backfill(collection, batch_size: int = 500, recompute_all: bool = False) -> int:
+    """Recompute the statistics server side, batch_size documents per update_many; returns documents updated."""
+    query = {} if recompute_all else {"valueCount": {"$exists": False}}
+    updated = 0
+    last_id = None
+    while True:
+        page_query = {"$and": [query, {"_id": {"$gt": last_id}}]} if last_id is not None else query
+        ids = [doc["_id"] for doc in collection.find(page_query, {"_id": 1}).sort("_id", 1).limit(batch_size)]
+        if not ids:
+            return updated
+        updated += collection.update_many({"_id": {"$in": ids}}, [STATS_STAGE]).modified_count
+        last_id = ids[-1]
+        print(f"Backfilled {updated} player value documents")
+
+
+def main():
+    args = [arg for arg in sys.argv[1:] if arg != "--all"]
+    batch_size = int(args[0]) if args else 500
+    client = MongoClient(os.getenv("MONGO_URI", "mongodb://localhost:27017"))
+    collection = client[os.getenv("MONGO_DB_NAME", "football_db")]["player_values"]
+    try:
+        backfill(collection, batch_size, recompute_all="--all" in sys.argv)
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+# Shared fixtures: the blocking router over an in-memory mongomock database.
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from mongo.cache import COLLECTIONS, response_cache
+from mongo.injuries import injury_intervals
+from mongo.routes import router
+
+
+@pytest.fixture
+def database(monkeypatch):
+    mongomock = pytest.importorskip("mongomock")
+    # mongomock checks documents with the default codec options, which refuse native UUIDs;
+    # the real clients are created with uuidRepresentation="standard"
+    monkeypatch.setattr(mongomock.collection, "BSON", None)
+    return mongomock.MongoClient()["football_db"]
+
+
+@pytest.fixture
+def app(database):
+    app = FastAPI()
+    app.include_router(router)
+    app.database = database
+    # the caches are per process; start every test from an empty database and empty caches
+    response_cache.invalidate(*COLLECTIONS)
+    injury_intervals.invalidate()
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return TestClient(app)
@@ -0,0 +1,28 @@
+# Per-item report of the /bulk routes (mongo/bulk.py).
+import uuid
+
+TEAM = {"team_name": "Atlas", "email": "atlas@example.com", "password": "password", "owner": "Atlas FC"}
+
+
+def test_report_maps_results_to_request_positions(client, database):
+    items = [TEAM, {"team_name": "missing fields"}, {**TEAM, "team_name": "León"}]
+    body = client.post("/team/bulk", json=items).json()
+    assert (body["inserted"], body["failed"]) == (2, 1)
+    assert [result["index"] for result in body["results"]] == [0, 1, 2]
+    assert [result["ok"] for result in body["results"]] == [True, False, True]
+    assert "email" in body["results"][1]["error"]
+    # the ids reported are the ones stored, in request order
+    stored = {doc["_id"]: doc["team_name"] for doc in database.teams.find()}
+    assert stored[uuid.UUID(body["results"][0]["id"])] == "Atlas"
+    assert stored[uuid.UUID(body["results"][2]["id"])] == "León"
+
+
+def test_duplicate_keys_fail_only_their_items(client, database):
+    team_id = str(uuid.uuid4())
+    items = [{**TEAM, "team_name": "no id"}, {**TEAM, "_id": team_id}, {"team_name": "invalid"}, {**TEAM, "_id": team_id}]
+    body = client.post("/team/bulk", json=items).json()
+    # the write error of the second copy points at its request position (3), not its insert_many position (2)
+    assert [result["ok"] for result in body["results"]] == [True, True, False, False]
+    assert body["results"][3]["error"].startswith("E11000")
+    assert body["results"][1]["id"] == team_id
+    assert database.teams.count_documents({}) == 2
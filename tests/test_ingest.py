@@ -0,0 +1,51 @@
+# Resumable ingest (mongo/data/ingest.py): a crash between a batch's write and its checkpoint.
+import functools
+import json
+
+import pytest
+
+from mongo.data import ingest
+from mongo.data.ingest import Feed, load_checkpoint, write_mongo
+
+ROWS = [f"Team {n},team{n}@example.com,secret,Owner {n}" for n in range(1, 6)]
+
+
+@pytest.fixture
+def feed(tmp_path):
+    path = tmp_path / "team.csv"
+    # the fourth record has a field too many and goes to the dead letters
+    path.write_text("\n".join(["team_name,email,password,owner", *ROWS[:3], "Bad,row,with,five,fields", *ROWS[3:]]) + "\n",
+                    encoding="utf-8")
+    return Feed(str(path), "teams")
+
+
+def test_resume_after_a_crash_writes_every_row_once(feed, database, monkeypatch):
+    write = functools.partial(write_mongo, database)
+    save = ingest.save_checkpoint
+    calls = []
+
+    def crash_on_second_checkpoint(path, state):
+        calls.append(state["offset"])
+        if len(calls) == 2:
+            raise RuntimeError("crash")
+        save(path, state)
+
+    monkeypatch.setattr(ingest, "save_checkpoint", crash_on_second_checkpoint)
+    with pytest.raises(RuntimeError):
+        ingest.ingest(feed, write, batch_size=2)
+    # the second batch (Team 3 and the bad row) is in Mongo and the dead letters, but not in the checkpoint
+    assert database.teams.count_documents({}) == 3
+    assert load_checkpoint(feed.checkpoint_path)["rows"] == 2
+
+    monkeypatch.setattr(ingest, "save_checkpoint", save)
+    state = ingest.ingest(feed, write, batch_size=2)
+    assert database.teams.count_documents({}) == 5
+    assert sorted(database.teams.distinct("team_name")) == [f"Team {n}" for n in range(1, 6)]
+    assert (state["rows"], state["rejected"]) == (6, 1)
+    with open(feed.dead_letter_path, encoding="utf-8") as fd:
+        dead_letters = [json.loads(line) for line in fd]
+    assert [letter["record"].strip() for letter in dead_letters] == ["Bad,row,with,five,fields"]
+
+    # a finished feed is a no-op
+    assert ingest.ingest(feed, write, batch_size=2)["rows"] == 6
+    assert database.teams.count_documents({}) == 5
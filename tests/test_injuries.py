@@ -0,0 +1,27 @@
+# The in-memory injury interval tree (mongo/injuries.py) against a linear scan.
+import random
+from datetime import datetime, timedelta
+
+from mongo.injuries import build_tree, stab
+
+START = datetime(2024, 1, 1)
+
+
+def test_stab_matches_a_linear_scan():
+    rng = random.Random(20)
+    intervals = []
+    for n in range(300):
+        start = START + timedelta(days=rng.randrange(365))
+        intervals.append((start, start + timedelta(days=rng.randrange(60)), n))
+    # a few zero length injuries and exact duplicates
+    intervals += [(START, START, 300), intervals[0][:2] + (301,)]
+    tree = build_tree(intervals)
+    moments = [START + timedelta(days=day, hours=hour) for day in range(-5, 430, 3) for hour in (0, 12)]
+    moments += [point for start, end, _ in intervals for point in (start, end)]
+    for moment in moments:
+        expected = sorted(n for start, end, n in intervals if start <= moment <= end)
+        assert sorted(stab(tree, moment)) == expected, moment
+
+
+def test_stab_of_an_empty_tree():
+    assert stab(build_tree([]), START) == []
@@ -0,0 +1,39 @@
+# Keyset pagination of the list routes (mongo/pagination.py).
+from mongo.pagination import MATCHES_ORDER, NEXT_CURSOR_HEADER, keyset_filter
+
+
+def match(day: int, home: str) -> dict:
+    return {"home_team_name": home, "away_team_name": "Atlas", "date": f"2024-11-{day:02d}T19:00:00",
+            "status": "Finished", "score": "1-0", "officials": [], "statistics": None}
+
+
+def test_keyset_filter_resumes_after_the_last_sort_key():
+    query = keyset_filter({"status": "Finished"}, MATCHES_ORDER, ["2024-11-02", 7])
+    assert query == {"$and": [
+        {"status": "Finished"},
+        {"$or": [{"date": {"$gt": "2024-11-02"}}, {"date": "2024-11-02", "_id": {"$gt": 7}}]},
+    ]}
+
+
+def test_next_cursor_walks_every_match_once(client):
+    # two matches per day, so pages break inside a date and the _id tie breaker matters
+    rows = [match(day, home) for day in range(1, 4) for home in ("América", "León")]
+    assert client.post("/matches/bulk", json=rows).json()["inserted"] == 6
+    seen, params = [], {"limit": 4}
+    while True:
+        response = client.get("/matches", params=params)
+        assert response.status_code == 200
+        seen.extend(response.json())
+        if NEXT_CURSOR_HEADER not in response.headers:
+            break
+        params = {"limit": 4, "after": response.headers[NEXT_CURSOR_HEADER]}
+    assert len(seen) == 6
+    assert len({item["_id"] for item in seen}) == 6
+    assert [item["date"] for item in seen] == sorted(item["date"] for item in seen)
+
+
+def test_bad_cursor_is_a_400(client):
+    for after in ("not base64!", "bm90IGpzb24=", "WzFd"):  # garbage, "not json", [1] (wrong length)
+        response = client.get("/matches", params={"limit": 2, "after": after})
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Invalid pagination cursor"
@@ -0,0 +1,40 @@
+# NDJSON streams of the full models after documents were written through the API.
+import json
+import uuid
+
+from mongo.streaming import NDJSON_MEDIA_TYPE
+
+MATCH = {
+    "home_team_name": "Atlas",
+    "away_team_name": "Tigres UANL",
+    "date": "2024-11-15T19:00:00",
+    "status": "Finished",
+    "score": "2-1",
+    "officials": ["Ref1", "Ref2"],
+    "statistics": None,
+}
+
+
+def stream(client, path):
+    response = client.get(path, headers={"Accept": NDJSON_MEDIA_TYPE})
+    assert response.status_code == 200
+    return [json.loads(line) for line in response.text.splitlines() if line]
+
+
+def test_matches_stream_after_post(app, client):
+    assert client.post("/matches", json=MATCH).status_code == 201
+    assert client.post("/matches/bulk", json=[MATCH]).status_code == 201
+    matches = stream(client, "/matches")
+    assert len(matches) == 2
+    assert all(match["date"] == "2024-11-15T19:00:00" for match in matches)
+    # stored as a BSON date, not as a string
+    assert app.database.matches.find_one()["date"].year == 2024
+
+
+def test_teams_stream_after_post(app, client):
+    team = {"team_name": "Atlas", "email": "atlas@example.com", "password": "password", "owner": "Atlas FC"}
+    team_id = client.post("/team", json=team).json()["_id"]
+    teams = stream(client, "/teams")
+    assert [item["_id"] for item in teams] == [team_id]
+    # native UUID in Mongo (binary subtype 4), string in the response
+    assert app.database.teams.find_one()["_id"] == uuid.UUID(team_id)
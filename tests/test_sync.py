@@ -0,0 +1,41 @@
+# Incremental sync (mongo/data/sync.py): a second run over the same rows writes nothing.
+from mongo.data.sync import NATURAL_KEYS, plan, sync_collection
+
+ROWS = [{"team_name": f"Team {n}", "email": f"team{n}@example.com", "password": "secret", "owner": f"Owner {n}"}
+        for n in range(1, 5)]
+
+
+def counts(inserted=0, updated=0, deleted=0, unchanged=0, rejected=0) -> dict:
+    return {"inserted": inserted, "updated": updated, "deleted": deleted, "unchanged": unchanged, "rejected": rejected}
+
+
+def test_second_sync_is_a_no_op(database):
+    assert sync_collection(database, "teams", [dict(row) for row in ROWS]) == counts(inserted=4)
+    ids = sorted(database.teams.distinct("_id"))
+    assert sync_collection(database, "teams", [dict(row) for row in ROWS]) == counts(unchanged=4)
+    # the stored documents were not rewritten
+    assert sorted(database.teams.distinct("_id")) == ids
+
+
+def test_changes_only_touch_their_documents(database):
+    sync_collection(database, "teams", [dict(row) for row in ROWS])
+    kept_id = database.teams.find_one({"team_name": "Team 2"})["_id"]
+    rows = [dict(row) for row in ROWS[1:]] + [{**ROWS[0], "team_name": "Team 5"}]
+    rows[0]["owner"] = "New owner"
+    assert sync_collection(database, "teams", rows) == counts(inserted=1, updated=1, deleted=1, unchanged=2)
+    changed = database.teams.find_one({"team_name": "Team 2"})
+    assert (changed["_id"], changed["owner"]) == (kept_id, "New owner")
+    assert sorted(database.teams.distinct("team_name")) == ["Team 2", "Team 3", "Team 4", "Team 5"]
+    assert sync_collection(database, "teams", rows) == counts(unchanged=4)
+
+
+def test_plan_against_its_own_result_is_empty():
+    docs = [dict(row, _id=n) for n, row in enumerate(ROWS)]
+    operations, first = plan(docs, [], NATURAL_KEYS["teams"])
+    assert (len(operations), first["inserted"]) == (4, 4)
+    # what is stored after the first plan: key fields and hashes, under the same ids
+    stored = [{"_id": doc["_id"], "team_name": doc["team_name"], "sync_hash": doc["sync_hash"]} for doc in docs]
+    again = [dict(row, _id=n + 10) for n, row in enumerate(ROWS)]
+    operations, second = plan(again, stored, NATURAL_KEYS["teams"])
+    assert operations == []
+    assert second == {"inserted": 0, "updated": 0, "deleted": 0, "unchanged": 4}